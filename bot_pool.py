@@ -0,0 +1,51 @@
+from telegram import Bot
+from telegram.error import InvalidToken
+from telegram.utils.request import Request
+
+from exceptions import BotUnauthorizedError
+
+
+class BotPool:
+    """Хранит по одному Bot на токен с общим пулом соединений.
+
+    Все боты отправляют запросы через один Request, поэтому соединения
+    с Telegram переиспользуются между ботами и чатами.
+    """
+
+    def __init__(
+        self, con_pool_size=8, connect_timeout=5.0, read_timeout=10.0,
+    ):
+        """Создает общий пул соединений с Telegram."""
+        self.request = Request(
+            con_pool_size=con_pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self._bots = {}
+
+    def __len__(self):
+        """Возвращает число ботов в пуле."""
+        return len(self._bots)
+
+    def get(self, token):
+        """Возвращает Bot для токена, создавая его при первом обращении.
+
+        Для токена неверного формата вызывает BotUnauthorizedError.
+        """
+        bot = self._bots.get(token)
+        if bot is None:
+            try:
+                bot = Bot(token=token, request=self.request)
+            except InvalidToken as error:
+                raise BotUnauthorizedError from error
+            self._bots[token] = bot
+        return bot
+
+    def evict(self, token):
+        """Удаляет Bot с недействительным токеном."""
+        self._bots.pop(token, None)
+
+    def close(self):
+        """Закрывает соединения пула."""
+        self._bots.clear()
+        self.request.stop()
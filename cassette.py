@@ -0,0 +1,197 @@
+import codecs
+import gzip
+import json
+import shutil
+import tempfile
+import time
+
+from clock import SystemClock
+from exceptions import CassetteError
+
+DRAIN_CHUNK_SIZE = 64 * 1024
+RECORDED_HEADERS = ('Content-Type', 'ETag')
+
+
+def open_cassette(path, mode):
+    """Открывает файл кассеты, при расширении .gz — со сжатием."""
+    if path.endswith('.gz'):
+        return gzip.open(path, f'{mode}t', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def load_cassette(path):
+    """Загружает записанные запросы к API из кассеты."""
+    with open_cassette(path, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayResponse:
+    """Ответ API, воспроизведенный из кассеты."""
+
+    def __init__(self, interaction):
+        """Создает ответ из записи кассеты."""
+        self.status_code = interaction['status']
+        self.headers = interaction.get('headers', {})
+        self.text = interaction['body']
+        self.content = self.text.encode('utf-8')
+        self.latency = interaction.get('latency', 0)
+
+    def json(self):
+        """Декодирует тело ответа из JSON."""
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        """Отдает тело ответа частями."""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        """Закрывает ответ, для записанного ответа ничего не делает."""
+
+
+def write_interaction(path, interaction, body):
+    """Дописывает обращение к API в кассету.
+
+    body — файл с телом ответа, уже экранированным для строки JSON. Он
+    копируется частями, поэтому тело не загружается в память целиком.
+    """
+    prefix = json.dumps(interaction, ensure_ascii=False)[:-1]
+    with open_cassette(path, 'a') as file:
+        file.write(f'{prefix}, "body": "')
+        body.seek(0)
+        shutil.copyfileobj(body, file)
+        file.write('"}\n')
+
+
+class RecordingStream:
+    """Потоковый ответ, тело которого записывается в кассету по частям.
+
+    Части тела сохраняются во временный файл по мере чтения через
+    iter_content, обращение дописывается в кассету при закрытии ответа.
+    Непрочитанный остаток тела, например у ответа с ошибкой, при
+    закрытии дочитывается, чтобы кассета содержала каждое обращение.
+    """
+
+    def __init__(self, response, path, interaction):
+        """Оборачивает ответ транспорта."""
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.path = path
+        self.interaction = interaction
+        self._body = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._consumed = False
+        self._closed = False
+
+    def _write(self, chunk, final=False):
+        text = self._decoder.decode(chunk, final=final)
+        if text:
+            self._body.write(json.dumps(text, ensure_ascii=False)[1:-1])
+
+    def iter_content(self, chunk_size=1):
+        """Отдает тело ответа частями и записывает их."""
+        for chunk in self.response.iter_content(chunk_size):
+            self._write(chunk)
+            yield chunk
+        self._write(b'', final=True)
+        self._consumed = True
+
+    def close(self):
+        """Дочитывает и закрывает ответ, дописывает обращение в кассету."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if not self._consumed:
+                for _ in self.iter_content(DRAIN_CHUNK_SIZE):
+                    pass
+            write_interaction(self.path, self.interaction, self._body)
+        finally:
+            self.response.close()
+            self._body.close()
+
+
+class RecordingTransport:
+    """Выполняет запросы через transport и записывает их в кассету.
+
+    Каждое обращение дописывается отдельной строкой JSON: параметры,
+    код ответа, тело и время ответа. Заголовок Authorization не
+    сохраняется. Тело потокового ответа записывается по мере чтения.
+    """
+
+    def __init__(self, transport, path):
+        """Запоминает транспорт и путь к кассете."""
+        self.transport = transport
+        self.path = path
+
+    def get(self, url, params=None, **kwargs):
+        """Выполняет запрос и записывает его в кассету."""
+        started = time.monotonic()
+        response = self.transport.get(url, params=params, **kwargs)
+        latency = time.monotonic() - started
+        interaction = {
+            'url': url,
+            'params': params,
+            'status': response.status_code,
+            'headers': {
+                key: response.headers[key]
+                for key in RECORDED_HEADERS if key in response.headers
+            },
+            'latency': round(latency, 6),
+        }
+        if kwargs.get('stream'):
+            return RecordingStream(response, self.path, interaction)
+        interaction['body'] = response.text
+        with open_cassette(self.path, 'a') as file:
+            file.write(json.dumps(interaction, ensure_ascii=False) + '\n')
+        return response
+
+
+class ReplayTransport:
+    """Воспроизводит ответы API из кассеты по порядку.
+
+    speed задает ускорение относительно записанного времени ответа,
+    при speed=None ответы отдаются без задержки. Задержка выдерживается
+    по часам clock.
+    """
+
+    def __init__(self, path, speed=1.0, clock=None):
+        """Запоминает путь к кассете, она загружается при первом запросе."""
+        self.path = path
+        self.speed = speed
+        self.clock = clock or SystemClock()
+        self._interactions = None
+        self._position = 0
+
+    def __len__(self):
+        """Возвращает число записанных запросов."""
+        return len(self.interactions)
+
+    @property
+    def interactions(self):
+        """Записанные обращения к API, загружаются при первом доступе."""
+        if self._interactions is None:
+            self._interactions = load_cassette(self.path)
+        return self._interactions
+
+    def get(self, url, params=None, **kwargs):
+        """Возвращает следующий записанный ответ."""
+        if self._position >= len(self.interactions):
+            raise CassetteError(f'Кассета {self.path} исчерпана.')
+        response = ReplayResponse(self.interactions[self._position])
+        self._position += 1
+        if self.speed:
+            self.clock.sleep(response.latency / self.speed)
+        return response
+
+
+def make_transport(mode, path, transport, speed=1.0, clock=None):
+    """Возвращает транспорт для запросов к API по режиму кассеты."""
+    if not mode:
+        return transport
+    if mode == 'record':
+        return RecordingTransport(transport, path)
+    if mode == 'replay':
+        return ReplayTransport(path, speed, clock)
+    raise ValueError(f'Неизвестный режим кассеты: {mode}.')
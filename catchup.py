@@ -0,0 +1,217 @@
+import codecs
+import fcntl
+import json
+import os
+import tempfile
+from datetime import datetime
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+
+
+class ResponseStream:
+    """Потоково разбирает JSON-объект ответа API.
+
+    Элементы массива array_key выдаются по одному при итерации и не
+    накапливаются в памяти. Значения остальных ключей сохраняются в
+    fields, все встреченные ключи — в keys.
+    """
+
+    def __init__(self, chunks, array_key='homeworks'):
+        """Запоминает источник частей тела ответа."""
+        self.array_key = array_key
+        self.fields = {}
+        self.keys = set()
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._finished = False
+
+    def __iter__(self):
+        """Выдает элементы массива array_key по мере чтения."""
+        self._expect('{')
+        if self._peek() == '}':
+            self._expect('}')
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            self.keys.add(key)
+            if key == self.array_key:
+                yield from self._iter_array()
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                return
+
+    def _iter_array(self):
+        if self._peek() != '[':
+            raise TypeError(f'{self.array_key} не является списком.')
+        self._expect('[')
+        if self._peek() == ']':
+            self._expect(']')
+            return
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+
+    def _read(self):
+        if self._finished:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            self._finished = True
+        else:
+            self._buffer += self._text_decoder.decode(chunk)
+        return True
+
+    def _peek(self):
+        while True:
+            self._buffer = self._buffer.lstrip()
+            if self._buffer:
+                return self._buffer[0]
+            if not self._read():
+                return None
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char is None or char not in chars:
+            raise ValueError(
+                f'Некорректный JSON: ожидался один из символов {chars!r}, '
+                f'получен {char!r}.'
+            )
+        self._buffer = self._buffer[1:]
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            if end < len(self._buffer) or self._finished:
+                self._buffer = self._buffer[end:]
+                return value
+            self._read()
+
+
+def parse_date(value):
+    """Переводит дату обновления работы из ответа API в timestamp."""
+    return int(datetime.strptime(
+        value.replace('Z', '+0000'), DATE_FORMAT
+    ).timestamp())
+
+
+def iter_windows(start, end, size):
+    """Делит промежуток [start, end) на окна не длиннее size."""
+    while start + size < end:
+        yield start, start + size, False
+        start += size
+    yield start, end, True
+
+
+def read_window(chunks, window_start, window_end, final):
+    """Читает работы, обновленные в окне, из потока ответа API.
+
+    Работы без даты обновления относятся к последнему окну. Возвращает
+    работы в порядке обновления и current_date из ответа.
+    """
+    stream = ResponseStream(chunks)
+    homeworks = []
+    for homework in stream:
+        if not isinstance(homework, dict):
+            raise TypeError('homework не является словарем.')
+        date_updated = homework.get('date_updated')
+        if date_updated is None:
+            if final:
+                homeworks.append((window_end, homework))
+            continue
+        updated = parse_date(date_updated)
+        if updated < window_start:
+            continue
+        if final or updated < window_end:
+            homeworks.append((updated, homework))
+    for key in ('homeworks', 'current_date'):
+        if key not in stream.keys:
+            raise KeyError(f'В response отсутствует ключ: {key}.')
+    homeworks.sort(key=lambda item: item[0])
+    return (
+        [homework for _, homework in homeworks],
+        stream.fields['current_date'],
+    )
+
+
+class Checkpoint:
+    """Хранит для каждого пользователя метку, до которой обработан API.
+
+    Метки, переданные в save, записываются в файл при вызове commit —
+    один раз за цикл опроса, после отправки уведомлений. Без пути к
+    файлу метки хранятся только в памяти. Файл общий для процессов,
+    опрашивающих разные сегменты: метки записываются поверх
+    перечитанного под блокировкой файла, поэтому процесс не затирает
+    метки чужих пользователей. Файл заменяется атомарно, чтобы сбой во
+    время записи не терял прогресс.
+    """
+
+    def __init__(self, path=None):
+        """Загружает сохраненные метки из файла."""
+        self.path = path
+        self._timestamps = {}
+        self._pending = {}
+        self.load()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def load(self):
+        """Перечитывает метки из файла, записанные другим процессом."""
+        if self.path:
+            self._timestamps = {**self._read(), **self._pending}
+
+    def get(self, name, default):
+        """Возвращает метку пользователя."""
+        return self._timestamps.get(name, default)
+
+    def save(self, name, timestamp):
+        """Запоминает метку пользователя до следующего commit."""
+        if self._timestamps.get(name) == timestamp:
+            return
+        self._timestamps[name] = timestamp
+        if self.path:
+            self._pending[name] = timestamp
+
+    def commit(self):
+        """Записывает в файл метки, сохраненные с прошлого commit.
+
+        Метка в файле не уменьшается, если ее уже продвинул процесс,
+        захвативший сегмент пользователя.
+        """
+        if not self._pending:
+            return
+        with open(f'{self.path}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            timestamps = self._read()
+            for name, timestamp in self._pending.items():
+                timestamps[name] = max(timestamp, timestamps.get(name, 0))
+            descriptor, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(self.path)),
+                prefix=f'{os.path.basename(self.path)}.',
+                suffix='.tmp',
+            )
+            try:
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                    json.dump(timestamps, file)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        self._pending.clear()
+        self._timestamps = timestamps
@@ -0,0 +1,32 @@
+import time
+
+
+class SystemClock:
+    """Системные часы."""
+
+    def time(self):
+        """Возвращает текущее время в секундах."""
+        return time.time()
+
+    def sleep(self, seconds):
+        """Приостанавливает работу на заданное время."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Часы, время которых двигается только при вызове sleep.
+
+    Позволяют прогнать дни циклов опроса за минуты.
+    """
+
+    def __init__(self, start=0.0):
+        """Устанавливает начальное время."""
+        self.now = start
+
+    def time(self):
+        """Возвращает текущее виртуальное время."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Переводит часы вперед без ожидания."""
+        self.now += max(seconds, 0)
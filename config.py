@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import signal
+from typing import NamedTuple
+
+from exceptions import ConfigError
+from tenants import Tenant
+
+TENANT_REQUIRED_KEYS = ('name', 'practicum_token', 'telegram_chat_id')
+
+logger = logging.getLogger(__name__)
+
+
+class Settings(NamedTuple):
+    """Настройки бота, которые можно менять без перезапуска."""
+
+    telegram_token: str
+    retry_time: int
+    homework_verdicts: dict
+    tenants: tuple
+
+
+def parse_tenants(items):
+    """Проверяет и собирает список пользователей из конфигурации."""
+    if not isinstance(items, list):
+        raise ConfigError('tenants не является списком.')
+    tenants = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ConfigError('Пользователь в tenants не является словарем.')
+        for key in TENANT_REQUIRED_KEYS:
+            if not item.get(key):
+                raise ConfigError(f'У пользователя отсутствует ключ: {key}.')
+        tenants.append(Tenant(**{
+            key: item[key] for key in Tenant._fields if key in item
+        }))
+    names = [tenant.name for tenant in tenants]
+    if len(set(names)) != len(names):
+        raise ConfigError('Имена пользователей в tenants повторяются.')
+    return tuple(tenants)
+
+
+def validate_settings(settings):
+    """Проверяет настройки перед тем, как их применить."""
+    if not settings.telegram_token:
+        raise ConfigError('Не задан telegram_token.')
+    retry_time = settings.retry_time
+    if not isinstance(retry_time, int) or retry_time <= 0:
+        raise ConfigError('retry_time должен быть положительным числом.')
+    verdicts = settings.homework_verdicts
+    if not isinstance(verdicts, dict) or not verdicts or not all(
+        isinstance(value, str) for value in verdicts.values()
+    ):
+        raise ConfigError('homework_verdicts должен быть словарем строк.')
+    if not settings.tenants:
+        raise ConfigError('Не задан ни один пользователь.')
+    return settings
+
+
+def load_settings(path, defaults):
+    """Загружает настройки из файла поверх настроек по умолчанию."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError) as error:
+        raise ConfigError(f'Не удалось прочитать {path}: {error}') from error
+    if not isinstance(data, dict):
+        raise ConfigError(f'{path} не содержит словарь настроек.')
+    values = defaults._asdict()
+    for key in Settings._fields:
+        if key in data:
+            values[key] = data[key]
+    if 'tenants' in data:
+        values['tenants'] = parse_tenants(data['tenants'])
+    return validate_settings(Settings(**values))
+
+
+class ConfigWatcher:
+    """Следит за файлом конфигурации и перечитывает его при изменении.
+
+    Файл перечитывается, когда меняется время его изменения или процесс
+    получает SIGHUP. Некорректные настройки не применяются: бот
+    продолжает работать с предыдущими.
+    """
+
+    def __init__(self, path, defaults):
+        """Загружает настройки и подписывается на SIGHUP."""
+        self.path = path
+        self.settings = defaults
+        self._mtime = None
+        self._reload_requested = False
+        if path:
+            try:
+                self._mtime = os.stat(path).st_mtime
+            except OSError as error:
+                raise ConfigError(
+                    f'Не удалось прочитать {path}: {error}'
+                ) from error
+            self.settings = load_settings(path, defaults)
+            if hasattr(signal, 'SIGHUP'):
+                signal.signal(signal.SIGHUP, self._request_reload)
+        else:
+            validate_settings(defaults)
+        self._defaults = defaults
+
+    def _request_reload(self, signum, frame):
+        self._reload_requested = True
+
+    def poll(self):
+        """Возвращает новые настройки, если конфигурация изменилась."""
+        if not self.path:
+            return None
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as error:
+            logger.error(f'Файл конфигурации недоступен: {error}')
+            return None
+        if mtime == self._mtime and not self._reload_requested:
+            return None
+        self._mtime = mtime
+        self._reload_requested = False
+        try:
+            settings = load_settings(self.path, self._defaults)
+        except ConfigError as error:
+            logger.error(f'Новая конфигурация не применена: {error}')
+            return None
+        if settings == self.settings:
+            return None
+        self.settings = settings
+        logger.info('Конфигурация перечитана.')
+        return settings
@@ -0,0 +1,60 @@
+import hashlib
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKENDS = {
+    'json': json.loads,
+}
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = orjson.loads
+
+
+def get_json_loads(backend=None):
+    """Возвращает функцию декодирования JSON.
+
+    По умолчанию используется orjson, если он установлен, иначе
+    стандартный модуль json.
+    """
+    if not backend:
+        backend = 'orjson' if orjson is not None else 'json'
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f'Декодер JSON недоступен: {backend}.')
+    return JSON_BACKENDS[backend]
+
+
+def hash_body(body):
+    """Возвращает хеш тела ответа."""
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class ResponseCache:
+    """ETag и хеш тела последнего обработанного ответа API.
+
+    Новые значения запоминаются через check, но вступают в силу только
+    после commit, когда ответ успешно обработан. Иначе ответ, на котором
+    обработка упала, был бы пропущен при повторе.
+    """
+
+    def __init__(self):
+        """Создает пустой кеш."""
+        self.etag = None
+        self.digest = None
+        self._pending = None
+
+    def check(self, body, etag=None):
+        """Проверяет, совпадает ли тело ответа с обработанным ранее."""
+        digest = hash_body(body)
+        if digest == self.digest:
+            return True
+        self._pending = (etag, digest)
+        return False
+
+    def commit(self):
+        """Запоминает последний проверенный ответ как обработанный."""
+        if self._pending is not None:
+            self.etag, self.digest = self._pending
+            self._pending = None
@@ -0,0 +1,75 @@
+import hashlib
+import re
+from collections import deque
+
+NORMALIZE_PATTERNS = (
+    (re.compile(r'0x[0-9a-fA-F]+'), '<hex>'),
+    (re.compile(r'\d+'), '<n>'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(error):
+    """Возвращает отпечаток ошибки: класс и сообщение без изменяемых данных.
+
+    Числа и адреса в сообщении заменяются заглушками, поэтому ошибки,
+    отличающиеся только кодом ответа или временем запроса, совпадают.
+    """
+    message = str(error)
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        message = pattern.sub(replacement, message)
+    key = f'{type(error).__name__}:{message.strip()}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+class ErrorDigest:
+    """Считает повторяющиеся ошибки и ограничивает уведомления о них.
+
+    По каждому отпечатку отправляется не больше одного уведомления за
+    interval секунд. В уведомлении указывается, сколько раз ошибка
+    возникла за последние window секунд.
+    """
+
+    def __init__(self, interval=3600, window=3600):
+        """Задает интервал уведомлений и окно подсчета ошибок."""
+        self.interval = interval
+        self.window = window
+        self._occurrences = {}
+        self._last_sent = {}
+
+    def _count(self, key, now):
+        occurrences = self._occurrences[key]
+        while occurrences and occurrences[0] <= now - self.window:
+            occurrences.popleft()
+        return len(occurrences)
+
+    def record(self, error, now):
+        """Учитывает ошибку и возвращает текст уведомления или None."""
+        key = fingerprint(error)
+        self._occurrences.setdefault(key, deque()).append(now)
+        count = self._count(key, now)
+        last_sent = self._last_sent.get(key)
+        if last_sent is not None and now - last_sent < self.interval:
+            return None
+        self._last_sent[key] = now
+        if count == 1:
+            return f'Сбой в работе программы: {error}'
+        return (
+            f'Сбой в работе программы ({type(error).__name__} ×{count} '
+            f'за последние {self.window // 60} мин.): {error}'
+        )
+
+    def recover(self, now):
+        """Сбрасывает ошибки после успешного опроса.
+
+        Возвращает уведомление о восстановлении, если были сбои.
+        """
+        if not self._occurrences:
+            return None
+        total = sum(self._count(key, now) for key in self._occurrences)
+        self._occurrences.clear()
+        self._last_sent.clear()
+        return (
+            'Работа программы восстановлена. Сбоев за последние '
+            f'{self.window // 60} мин.: {total}.'
+        )
@@ -10,6 +10,12 @@ class SendMessageError(DontSendException):
     pass
 
 
+class ChatForbiddenError(SendMessageError):
+    """Возникает, когда бот не может писать в чат, например заблокирован."""
+
+    pass
+
+
 class BotUnauthorizedError(DontSendException):
     """Возникает, когда у бота недостаточно прав для выполнения запроса."""
 
@@ -38,3 +44,15 @@ class AnotherStatusError(SendException):
     """Возникает, когда недокументированный статус домашней работы."""
 
     pass
+
+
+class CassetteError(DontSendException):
+    """Возникает, когда кассета с записью запросов к API исчерпана."""
+
+    pass
+
+
+class ConfigError(DontSendException):
+    """Возникает, когда файл конфигурации содержит некорректные настройки."""
+
+    pass
@@ -0,0 +1,200 @@
+import argparse
+import sqlite3
+
+VERDICTS = ('approved', 'rejected')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS transitions (
+    id INTEGER PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    status TEXT NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transitions_tenant_homework
+    ON transitions (tenant, homework, updated_at);
+CREATE INDEX IF NOT EXISTS transitions_updated_at
+    ON transitions (updated_at);
+CREATE TABLE IF NOT EXISTS homework_stats (
+    tenant TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    last_status TEXT NOT NULL,
+    last_updated_at INTEGER NOT NULL,
+    reviewing_at INTEGER,
+    reviews INTEGER NOT NULL DEFAULT 0,
+    rejections INTEGER NOT NULL DEFAULT 0,
+    to_reviewing_total INTEGER NOT NULL DEFAULT 0,
+    to_reviewing_count INTEGER NOT NULL DEFAULT 0,
+    to_verdict_total INTEGER NOT NULL DEFAULT 0,
+    to_verdict_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant, homework)
+);
+CREATE TABLE IF NOT EXISTS tenant_stats (
+    tenant TEXT PRIMARY KEY,
+    homeworks INTEGER NOT NULL DEFAULT 0,
+    reviews INTEGER NOT NULL DEFAULT 0,
+    rejections INTEGER NOT NULL DEFAULT 0,
+    to_reviewing_total INTEGER NOT NULL DEFAULT 0,
+    to_reviewing_count INTEGER NOT NULL DEFAULT 0,
+    to_verdict_total INTEGER NOT NULL DEFAULT 0,
+    to_verdict_count INTEGER NOT NULL DEFAULT 0
+);
+'''
+
+AGGREGATES = (
+    'reviews', 'rejections', 'to_reviewing_total', 'to_reviewing_count',
+    'to_verdict_total', 'to_verdict_count',
+)
+AGGREGATE_COLUMNS = ', '.join(AGGREGATES)
+AGGREGATE_VALUES = ', '.join('?' * len(AGGREGATES))
+AGGREGATE_UPDATES = ', '.join(
+    f'{key} = {key} + excluded.{key}' for key in AGGREGATES
+)
+
+
+class HistoryStore:
+    """История изменений статусов домашних работ в SQLite.
+
+    Вместе с каждым переходом обновляются сводки по работе и по
+    пользователю, поэтому статистика читается одной строкой без обхода
+    истории. Время до проверки отсчитывается от предыдущего вердикта,
+    время до вердикта — от начала проверки.
+    """
+
+    def __init__(self, path):
+        """Открывает базу и создает таблицы, если их нет."""
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def record(self, tenant, homework, status, updated_at):
+        """Сохраняет переход статуса, повторный статус не сохраняется."""
+        with self.connection:
+            row = self.connection.execute(
+                'SELECT * FROM homework_stats '
+                'WHERE tenant = ? AND homework = ?',
+                (tenant, homework),
+            ).fetchone()
+            if row is not None and row['last_status'] == status:
+                return False
+            self.connection.execute(
+                'INSERT INTO transitions '
+                '(tenant, homework, status, updated_at) VALUES (?, ?, ?, ?)',
+                (tenant, homework, status, updated_at),
+            )
+            delta = dict.fromkeys(AGGREGATES, 0)
+            reviewing_at = row['reviewing_at'] if row is not None else None
+            if status == 'reviewing':
+                delta['reviews'] = 1
+                if row is not None and row['last_status'] in VERDICTS:
+                    delta['to_reviewing_total'] = (
+                        updated_at - row['last_updated_at']
+                    )
+                    delta['to_reviewing_count'] = 1
+                reviewing_at = updated_at
+            elif status in VERDICTS:
+                if reviewing_at is not None:
+                    delta['to_verdict_total'] = updated_at - reviewing_at
+                    delta['to_verdict_count'] = 1
+                    reviewing_at = None
+                if status == 'rejected':
+                    delta['rejections'] = 1
+            self._update_homework(
+                tenant, homework, status, updated_at, reviewing_at, delta,
+            )
+            self._update_tenant(tenant, int(row is None), delta)
+        return True
+
+    def _update_homework(
+        self, tenant, homework, status, updated_at, reviewing_at, delta,
+    ):
+        self.connection.execute(
+            'INSERT INTO homework_stats '
+            '(tenant, homework, last_status, last_updated_at, reviewing_at, '
+            f'{AGGREGATE_COLUMNS}) '
+            f'VALUES (?, ?, ?, ?, ?, {AGGREGATE_VALUES}) '
+            'ON CONFLICT (tenant, homework) DO UPDATE SET '
+            'last_status = excluded.last_status, '
+            'last_updated_at = excluded.last_updated_at, '
+            f'reviewing_at = excluded.reviewing_at, {AGGREGATE_UPDATES}',
+            (tenant, homework, status, updated_at, reviewing_at,
+             *(delta[key] for key in AGGREGATES)),
+        )
+
+    def _update_tenant(self, tenant, new_homeworks, delta):
+        self.connection.execute(
+            'INSERT INTO tenant_stats '
+            f'(tenant, homeworks, {AGGREGATE_COLUMNS}) '
+            f'VALUES (?, ?, {AGGREGATE_VALUES}) '
+            'ON CONFLICT (tenant) DO UPDATE SET '
+            f'homeworks = homeworks + excluded.homeworks, {AGGREGATE_UPDATES}',
+            (tenant, new_homeworks, *(delta[key] for key in AGGREGATES)),
+        )
+
+    def homework_stats(self, tenant, homework):
+        """Возвращает сводку по домашней работе или None."""
+        row = self.connection.execute(
+            'SELECT * FROM homework_stats WHERE tenant = ? AND homework = ?',
+            (tenant, homework),
+        ).fetchone()
+        return summarize(row)
+
+    def tenant_stats(self, tenant):
+        """Возвращает сводку по пользователю или None."""
+        row = self.connection.execute(
+            'SELECT * FROM tenant_stats WHERE tenant = ?', (tenant,),
+        ).fetchone()
+        return summarize(row)
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+
+def summarize(row):
+    """Переводит строку сводки в словарь со средними временами."""
+    if row is None:
+        return None
+    stats = dict(row)
+    for name in ('to_reviewing', 'to_verdict'):
+        total = stats.pop(f'{name}_total')
+        count = stats.pop(f'{name}_count')
+        stats[f'{name}_avg'] = total / count if count else None
+    return stats
+
+
+def format_duration(seconds):
+    """Форматирует длительность в часах."""
+    if seconds is None:
+        return 'нет данных'
+    return f'{seconds / 3600:.1f} ч'
+
+
+def main():
+    """Выводит статистику проверки домашних работ."""
+    parser = argparse.ArgumentParser(
+        description='Статистика проверки домашних работ.'
+    )
+    parser.add_argument('path', help='путь к базе истории')
+    parser.add_argument('tenant', help='имя пользователя')
+    parser.add_argument('--homework', help='название домашней работы')
+    args = parser.parse_args()
+    store = HistoryStore(args.path)
+    if args.homework:
+        stats = store.homework_stats(args.tenant, args.homework)
+    else:
+        stats = store.tenant_stats(args.tenant)
+    store.close()
+    if stats is None:
+        print('Нет данных.')
+        return
+    print(f'Проверок: {stats["reviews"]}')
+    print(f'Отклонено: {stats["rejections"]}')
+    print(f'Среднее время до проверки: '
+          f'{format_duration(stats["to_reviewing_avg"])}')
+    print(f'Среднее время проверки: '
+          f'{format_duration(stats["to_verdict_avg"])}')
+
+
+if __name__ == '__main__':
+    main()
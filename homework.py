@@ -1,17 +1,28 @@
 import logging
 import os
 import sys
-import time
+from contextlib import closing
 
 import requests
 import telegram.error
 from dotenv import load_dotenv
-from telegram import Bot
 
+from bot_pool import BotPool
+from cassette import make_transport
+from catchup import Checkpoint, iter_windows, parse_date, read_window
+from clock import SystemClock
+from config import ConfigWatcher, Settings
+from decoding import get_json_loads
 from exceptions import (
     BotUnauthorizedError, SendMessageError, EndpointAPIError, RequestAPIError,
-    AnotherStatusError,
+    AnotherStatusError, ConfigError, ChatForbiddenError,
 )
+from history import HistoryStore
+from lease import make_lease_group
+from notifications import Notifier
+from scheduler import PollScheduler
+from tenants import Tenant, TenantState
+from tracing import JSONLinesExporter, TraceFilter, Tracer
 
 load_dotenv()
 
@@ -20,32 +31,78 @@ TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_TIME = 600
+BOT_POOL_SIZE = int(os.getenv('BOT_POOL_SIZE', 8))
+BOT_CONNECT_TIMEOUT = float(os.getenv('BOT_CONNECT_TIMEOUT', 5))
+BOT_READ_TIMEOUT = float(os.getenv('BOT_READ_TIMEOUT', 10))
+CONFIG_PATH = os.getenv('CONFIG_PATH')
+CONFIG_CHECK_TIME = 5
+CATCH_UP_WINDOW = 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH')
+JSON_LOADS = get_json_loads(os.getenv('JSON_BACKEND'))
+HISTORY_PATH = os.getenv('HISTORY_PATH')
+TRACE_PATH = os.getenv('TRACE_PATH')
+LEASE_BACKEND = os.getenv('LEASE_BACKEND')
+LEASE_PATH = os.getenv('LEASE_PATH', 'homework_bot.lease')
+LEASE_TTL = int(os.getenv('LEASE_TTL', 15))
+LEASE_SHARDS = int(os.getenv('LEASE_SHARDS', 1))
+LEASE_MAX_SHARDS = int(os.getenv('LEASE_MAX_SHARDS', 0)) or None
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+CLOCK = SystemClock()
+TRANSPORT = make_transport(
+    os.getenv('CASSETTE_MODE'),
+    os.getenv('CASSETTE_PATH', 'cassette.jsonl'),
+    requests,
+    float(os.getenv('CASSETTE_SPEED', 1)),
+    CLOCK,
+)
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', 10))
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+STATUS_PRIORITIES = {
+    'reviewing': 1,
+}
+
+TRACER = Tracer(JSONLinesExporter(TRACE_PATH) if TRACE_PATH else None)
+
+LOG_FORMAT = (
+    '%(asctime)s.%(msecs)03d [%(levelname)s] '
+    '[%(trace_id)s %(span_id)s] %(message)s'
+)
+LOG_DATEFMT = '%d-%b-%y %H:%M:%S'
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-formatter = logging.Formatter(
-    '%(asctime)s [%(levelname)s] %(message)s',
-    datefmt='%d-%b-%y %H:%M:%S',
-)
+formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT)
 handler = logging.StreamHandler()
 handler.setFormatter(formatter)
+handler.addFilter(TraceFilter())
 logger.addHandler(handler)
 
 
 def send_message(bot, message):
     """Bot отправляет сообщение в Telegram."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+@TRACER.span('telegram.send')
+def send_chat_message(bot, chat_id, message):
+    """Bot отправляет сообщение в указанный чат Telegram."""
     logger.info('Bot начал отправку сообщения в Telegram.')
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        bot.send_message(chat_id, message)
     except telegram.error.Unauthorized as error:
+        if str(error).startswith('Forbidden'):
+            raise ChatForbiddenError(
+                f'Bot не может писать в чат {chat_id}: {error}'
+            ) from error
+        raise BotUnauthorizedError from error
+    except telegram.error.InvalidToken as error:
         raise BotUnauthorizedError from error
     except telegram.error.TelegramError as error:
         error_message = (
@@ -58,21 +115,50 @@ def send_message(bot, message):
 
 def get_api_answer(current_timestamp):
     """Отправляет запрос к API."""
-    timestamp = current_timestamp or int(time.time())
+    return request_api(current_timestamp, HEADERS)
+
+
+def get_headers(practicum_token):
+    """Возвращает заголовки запроса к API для токена пользователя."""
+    return {'Authorization': f'OAuth {practicum_token}'}
+
+
+def request_api(current_timestamp, headers, cache=None):
+    """Отправляет запрос к API с заголовками пользователя.
+
+    Если передан cache, тело ответа декодируется только когда оно
+    изменилось с прошлого обработанного ответа, иначе возвращается None.
+    """
+    timestamp = current_timestamp or int(CLOCK.time())
     params = {'from_date': timestamp}
+    if cache is not None and cache.etag:
+        headers = {**headers, 'If-None-Match': cache.etag}
     try:
-        response = requests.get(
-            ENDPOINT,
-            headers=HEADERS,
-            params=params,
-        )
+        with TRACER.span('http.request', from_date=timestamp) as span:
+            response = TRANSPORT.get(
+                ENDPOINT,
+                headers=headers,
+                params=params,
+                timeout=REQUEST_TIMEOUT,
+            )
+            span.set_attribute('http.status_code', response.status_code)
+        if cache is not None and (
+            response.status_code == requests.codes.not_modified
+        ):
+            return None
         if response.status_code != requests.codes.ok:
             message = (
                 f'Эндпоинт {ENDPOINT} недоступен.\n'
                 f'Код ответа API: {response.status_code}'
             )
             raise EndpointAPIError(message)
-        return response.json()
+        if cache is None:
+            with TRACER.span('json.decode'):
+                return response.json()
+        if cache.check(response.content, response.headers.get('ETag')):
+            return None
+        with TRACER.span('json.decode', size=len(response.content)):
+            return JSON_LOADS(response.content)
     except Exception as error:
         message = (
             f'Произошёл сбой при запросе к эндпоинту {ENDPOINT}\n'
@@ -81,6 +167,42 @@ def get_api_answer(current_timestamp):
         raise RequestAPIError(message)
 
 
+def request_window(headers, window_start, window_end, final):
+    """Потоково загружает работы, обновленные в окне опроса."""
+    params = {'from_date': window_start}
+    try:
+        with TRACER.span('http.request', from_date=window_start) as span:
+            response = TRANSPORT.get(
+                ENDPOINT,
+                headers=headers,
+                params=params,
+                stream=True,
+                timeout=REQUEST_TIMEOUT,
+            )
+            span.set_attribute('http.status_code', response.status_code)
+    except Exception as error:
+        message = (
+            f'Произошёл сбой при запросе к эндпоинту {ENDPOINT}\n'
+            f'Ошибка: {error}'
+        )
+        raise RequestAPIError(message)
+    with closing(response):
+        if response.status_code != requests.codes.ok:
+            message = (
+                f'Эндпоинт {ENDPOINT} недоступен.\n'
+                f'Код ответа API: {response.status_code}'
+            )
+            raise EndpointAPIError(message)
+        with TRACER.span('json.decode', streaming=True):
+            return read_window(
+                response.iter_content(CHUNK_SIZE),
+                window_start,
+                window_end,
+                final,
+            )
+
+
+@TRACER.span('validate')
 def check_response(response):
     """Проверяет ответ от API."""
     if not isinstance(response, dict):
@@ -94,6 +216,7 @@ def check_response(response):
     return homeworks
 
 
+@TRACER.span('render')
 def parse_status(homework):
     """Извлекает статус домашней работы."""
     for key in ('homework_name', 'status'):
@@ -114,7 +237,7 @@ def check_tokens():
 
 def check_program_starting():
     """Проверяет запуск программы."""
-    if not check_tokens():
+    if not CONFIG_PATH and not check_tokens():
         logger.critical(
             'Отсутствует обязательная переменная окружения.\n'
             'Программа принудительно остановлена.'
@@ -123,52 +246,291 @@ def check_program_starting():
     logger.info('Программа запущена.')
 
 
+def get_default_settings():
+    """Возвращает настройки из переменных окружения."""
+    tenants = ()
+    if PRACTICUM_TOKEN and TELEGRAM_CHAT_ID:
+        tenants = (Tenant('default', PRACTICUM_TOKEN, TELEGRAM_CHAT_ID),)
+    return Settings(TELEGRAM_TOKEN, RETRY_TIME, HOMEWORK_VERDICTS, tenants)
+
+
+def notify_error(notifier, tenant, state, error):
+    """Сообщает пользователю о сбое не чаще, чем позволяет сводка ошибок."""
+    message = f'Сбой в работе программы: {error}'
+    logger.error(message)
+    digest = state.errors.record(error, CLOCK.time())
+    if digest is not None:
+        notifier.notify_error(tenant, digest)
+
+
+def record_history(history, tenant, homeworks):
+    """Сохраняет статусы домашних работ в историю."""
+    if history is None:
+        return
+    for homework in homeworks:
+        date_updated = homework.get('date_updated')
+        updated_at = (
+            parse_date(date_updated) if date_updated else int(CLOCK.time())
+        )
+        history.record(
+            tenant.name,
+            homework.get('homework_name'),
+            homework.get('status'),
+            updated_at,
+        )
+
+
+def check_updates(notifier, tenant, state, history=None):
+    """Опрашивает API для пользователя и сообщает об изменении статуса."""
+    response = request_api(
+        state.current_timestamp,
+        get_headers(tenant.practicum_token),
+        state.response_cache,
+    )
+    if response is None:
+        logger.debug('Ответ API не изменился.')
+        return
+    homeworks = check_response(response)
+    if not homeworks:
+        logger.debug(
+            'В настоящее время на проверке нет домашней работы или '
+            'ревьюер еще не начал проверку.'
+        )
+    elif state.previous_homeworks != homeworks:
+        status = parse_status(homeworks[0])
+        record_history(history, tenant, homeworks[::-1])
+        notifier.notify_status(tenant, status)
+        logger.info(status)
+        state.previous_homeworks = homeworks
+        state.last_status = homeworks[0].get('status')
+    else:
+        logger.debug('Статус домашней работы не изменился.')
+    state.current_timestamp = response.get('current_date')
+    state.response_cache.commit()
+
+
+def catch_up(notifier, tenant, state, checkpoint, history=None):
+    """Догоняет изменения статусов после долгого перерыва в опросе.
+
+    Пропущенный промежуток обрабатывается по окнам CATCH_UP_WINDOW от
+    старых к новым, после каждого окна прогресс запоминается в checkpoint.
+    Уведомления ставятся в очередь, только если все работы окна прошли
+    проверку, иначе окно повторяется при следующем опросе целиком.
+    """
+    logger.info(
+        f'Пользователь {tenant.name}: обработка изменений '
+        f'с {state.current_timestamp}.'
+    )
+    headers = get_headers(tenant.practicum_token)
+    windows = iter_windows(
+        state.current_timestamp, int(CLOCK.time()), CATCH_UP_WINDOW,
+    )
+    for window_start, window_end, final in windows:
+        homeworks, current_date = request_window(
+            headers, window_start, window_end, final,
+        )
+        statuses = [parse_status(homework) for homework in homeworks]
+        record_history(history, tenant, homeworks)
+        for homework, status in zip(homeworks, statuses):
+            notifier.notify_status(tenant, status)
+            logger.info(status)
+            state.last_status = homework.get('status')
+        if homeworks:
+            state.previous_homeworks = homeworks[::-1]
+        state.current_timestamp = current_date if final else window_end
+        checkpoint.save(tenant.name, state.current_timestamp)
+
+
+def poll_tenant(notifier, tenant, state, checkpoint, history=None):
+    """Опрашивает API для пользователя и обрабатывает сбои."""
+    try:
+        if CLOCK.time() - state.current_timestamp > CATCH_UP_WINDOW:
+            catch_up(notifier, tenant, state, checkpoint, history)
+        else:
+            check_updates(notifier, tenant, state, history)
+            checkpoint.save(tenant.name, state.current_timestamp)
+    except BotUnauthorizedError:
+        raise
+    except Exception as error:
+        notify_error(notifier, tenant, state, error)
+    else:
+        notice = state.errors.recover(CLOCK.time())
+        if notice is not None:
+            logger.info(notice)
+            notifier.notify_error(tenant, notice)
+
+
+class Worker:
+    """Опрашивает API для пользователей по расписанию.
+
+    Если задана группа аренд, опрашиваются только пользователи из
+    удерживаемых сегментов, остальных опрашивают другие процессы.
+    """
+
+    def __init__(self, settings, checkpoint, bots, leases=None, history=None):
+        """Применяет настройки и распределяет опросы по интервалу."""
+        self.settings = settings
+        self.bots = bots
+        self.notifier = Notifier(
+            bots, send_chat_message, settings.telegram_token,
+        )
+        self.history = history
+        self.tenants = dict()
+        self.states = dict()
+        self.scheduler = PollScheduler(settings.retry_time)
+        self.checkpoint = checkpoint
+        self.leases = leases
+        self._renewed_at = None
+        self.apply_settings(settings, CLOCK.time())
+
+    def apply_settings(self, settings, now):
+        """Применяет настройки между циклами опроса.
+
+        Опросы новых пользователей распределяются по интервалу, у
+        оставшихся сохраняется состояние и срок следующего опроса.
+        """
+        global RETRY_TIME, HOMEWORK_VERDICTS
+        self.settings = settings
+        self.notifier.telegram_token = settings.telegram_token
+        RETRY_TIME = settings.retry_time
+        HOMEWORK_VERDICTS = settings.homework_verdicts
+        self.scheduler.interval = settings.retry_time
+        tenants = {tenant.name: tenant for tenant in settings.tenants}
+        for name in self.tenants.keys() - tenants.keys():
+            self.scheduler.remove(name)
+            del self.states[name]
+        added = [name for name in tenants if name not in self.tenants]
+        for name in added:
+            self.states[name] = TenantState(
+                self.checkpoint.get(name, int(now))
+            )
+        self.scheduler.spread(added, now)
+        self.tenants = tenants
+
+    def refresh_leases(self, now):
+        """Продлевает аренду и забирает состояние захваченных сегментов.
+
+        Уведомления пользователей из потерянных сегментов остаются в
+        очереди и отправляются: прогресс их опроса уже не повторится.
+        """
+        if self.leases is None:
+            return
+        gained = self.leases.refresh()
+        self._renewed_at = now
+        if not gained:
+            return
+        self.checkpoint.load()
+        for name in self.tenants:
+            if self.leases.shard(name) in gained:
+                self.states[name] = TenantState(
+                    self.checkpoint.get(name, int(now))
+                )
+
+    def renew_leases(self):
+        """Продлевает аренду, если с последнего продления прошел срок.
+
+        Вызывается перед каждым опросом и отправкой уведомлений, чтобы
+        аренда не истекла посреди долгого цикла.
+        """
+        if self.leases is None:
+            return
+        now = CLOCK.time()
+        if now - self._renewed_at >= self.leases.renew_time:
+            self.refresh_leases(now)
+
+    def owns(self, name):
+        """Проверяет, опрашивает ли процесс пользователя."""
+        return self.leases is None or self.leases.owns(name)
+
+    def poll(self, tenant, state):
+        """Опрашивает API для пользователя."""
+        with TRACER.span('poll', tenant=tenant.name):
+            poll_tenant(
+                self.notifier, tenant, state, self.checkpoint, self.history,
+            )
+
+    def run_cycle(self, now):
+        """Опрашивает пользователей, срок опроса которых наступил.
+
+        Прогресс опроса записывается после отправки уведомлений, чтобы
+        сбой между ними не терял изменения статусов. Каждый цикл
+        образует отдельную трассировку.
+        """
+        with TRACER.span('cycle'):
+            self.refresh_leases(now)
+            for name in self.scheduler.pop_due(now):
+                self.renew_leases()
+                state = self.states[name]
+                if self.owns(name):
+                    self.poll(self.tenants[name], state)
+                priority = STATUS_PRIORITIES.get(state.last_status, 0)
+                self.scheduler.reschedule(name, now, priority)
+            self.renew_leases()
+            with TRACER.span('notify'):
+                self.notifier.flush()
+            self.checkpoint.commit()
+
+    def get_sleep_time(self):
+        """Возвращает время до следующего цикла опроса."""
+        sleep_time = self.scheduler.next_due() - CLOCK.time()
+        if CONFIG_PATH:
+            sleep_time = min(sleep_time, CONFIG_CHECK_TIME)
+        if self.leases is not None:
+            sleep_time = min(sleep_time, self.leases.renew_time)
+        return max(sleep_time, 0)
+
+    def close(self):
+        """Освобождает аренду и соединения с Telegram."""
+        if self.leases is not None:
+            self.leases.release()
+        if self.history is not None:
+            self.history.close()
+        self.bots.close()
+
+
+def run_worker(worker, watcher=None, cycles=None):
+    """Выполняет циклы опроса, cycles ограничивает их число."""
+    while cycles is None or cycles > 0:
+        worker.run_cycle(CLOCK.time())
+        settings = watcher.poll() if watcher is not None else None
+        if settings is not None:
+            worker.apply_settings(settings, CLOCK.time())
+        CLOCK.sleep(worker.get_sleep_time())
+        if cycles is not None:
+            cycles -= 1
+
+
 def main():
     """Основная логика работы бота."""
     check_program_starting()
-    bot = Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
-    last_homework = 0
-    previous_homeworks = list()
-    previous_error = Exception()
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            if not homeworks:
-                logger.debug(
-                    'В настоящее время на проверке нет домашней работы или '
-                    'ревьюер еще не начал проверку.'
-                )
-            elif previous_homeworks != homeworks:
-                status = parse_status(homeworks[last_homework])
-                send_message(bot, status)
-                logger.info(status)
-                previous_homeworks = homeworks
-            else:
-                logger.debug('Статус домашней работы не изменился.')
-            current_timestamp = response.get('current_date')
-        except BotUnauthorizedError:
-            logger.critical(
-                'У Bot недостаточно прав для выполнения запроса. '
-                'Возможно неправильно задан TELEGRAM_TOKEN.\n'
-                'Программа принудительно остановлена.'
-            )
-            sys.exit()
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logger.error(message)
-            try:
-                if previous_error.args != error.args:
-                    send_message(bot, message)
-                    previous_error = error
-            except SendMessageError as error:
-                logger.error(
-                    'Bot не смог отправить сообщение об ошибке в Telegram.'
-                    f'{error}'
-                )
-        finally:
-            time.sleep(RETRY_TIME)
+    try:
+        watcher = ConfigWatcher(CONFIG_PATH, get_default_settings())
+    except ConfigError as error:
+        logger.critical(
+            f'Некорректная конфигурация: {error}\n'
+            'Программа принудительно остановлена.'
+        )
+        sys.exit()
+    leases = make_lease_group(
+        LEASE_BACKEND, LEASE_PATH, LEASE_TTL, LEASE_SHARDS, LEASE_MAX_SHARDS,
+    )
+    bots = BotPool(BOT_POOL_SIZE, BOT_CONNECT_TIMEOUT, BOT_READ_TIMEOUT)
+    history = HistoryStore(HISTORY_PATH) if HISTORY_PATH else None
+    worker = Worker(
+        watcher.settings, Checkpoint(CHECKPOINT_PATH), bots, leases, history,
+    )
+    try:
+        run_worker(worker, watcher)
+    except BotUnauthorizedError:
+        logger.critical(
+            'У Bot недостаточно прав для выполнения запроса. '
+            'Возможно неправильно задан TELEGRAM_TOKEN.\n'
+            'Программа принудительно остановлена.'
+        )
+        sys.exit()
+    finally:
+        worker.close()
+        TRACER.close()
 
 
 if __name__ == '__main__':
@@ -176,8 +538,10 @@ if __name__ == '__main__':
         level=logging.INFO,
         filename='app.log',
         filemode='a',
-        format='%(asctime)s [%(levelname)s] %(message)s',
-        datefmt='%d-%b-%y %H:%M:%S',
+        format=LOG_FORMAT,
+        datefmt=LOG_DATEFMT,
         encoding='utf-8',
     )
+    for root_handler in logging.getLogger().handlers:
+        root_handler.addFilter(TraceFilter())
     main()
@@ -0,0 +1,167 @@
+import fcntl
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+def make_owner():
+    """Возвращает уникальный идентификатор процесса-владельца аренды."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+class FileLease:
+    """Аренда на основе блокировки файла.
+
+    Блокировку снимает операционная система, когда процесс-владелец
+    завершается, поэтому резервный процесс захватывает ее при следующей
+    попытке. Подходит для процессов на одной машине.
+    """
+
+    def __init__(self, path, name, owner, ttl):
+        """Запоминает путь к файлу блокировки."""
+        self.path = f'{path}.{name}.lock'
+        self.owner = owner
+        self._file = None
+
+    def acquire(self):
+        """Захватывает или продлевает аренду, возвращает успех."""
+        if self._file is not None:
+            return True
+        file = open(self.path, 'a+')
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+        file.truncate(0)
+        file.write(self.owner)
+        file.flush()
+        self._file = file
+        return True
+
+    def release(self):
+        """Освобождает аренду."""
+        if self._file is None:
+            return
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class SQLiteLease:
+    """Аренда с ограниченным сроком, хранящаяся в базе SQLite.
+
+    Владелец продлевает аренду, пока работает. Если он перестал это
+    делать, по истечении ttl секунд аренду захватывает другой процесс.
+    """
+
+    def __init__(self, path, name, owner, ttl):
+        """Открывает базу аренд и создает таблицу, если ее нет."""
+        self.name = name
+        self.owner = owner
+        self.ttl = ttl
+        self.connection = sqlite3.connect(
+            path, timeout=ttl, isolation_level=None,
+        )
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS leases ('
+            'name TEXT PRIMARY KEY, '
+            'owner TEXT NOT NULL, '
+            'expires_at REAL NOT NULL)'
+        )
+
+    def acquire(self):
+        """Захватывает или продлевает аренду, возвращает успех."""
+        now = time.time()
+        cursor = self.connection.execute(
+            'INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET '
+            'owner = excluded.owner, expires_at = excluded.expires_at '
+            'WHERE leases.owner = excluded.owner OR leases.expires_at < ?',
+            (self.name, self.owner, now + self.ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def release(self):
+        """Освобождает аренду."""
+        self.connection.execute(
+            'DELETE FROM leases WHERE name = ? AND owner = ?',
+            (self.name, self.owner),
+        )
+
+
+LEASE_BACKENDS = {
+    'file': FileLease,
+    'sqlite': SQLiteLease,
+}
+
+
+class LeaseGroup:
+    """Аренды сегментов пользователей, которые удерживает процесс.
+
+    Пользователь относится к сегменту по хешу имени. Процесс опрашивает
+    только пользователей из сегментов, аренду которых удерживает, и
+    удерживает не больше max_held сегментов, поэтому пользователей
+    можно распределить между несколькими процессами.
+    """
+
+    def __init__(self, leases, ttl, max_held=None):
+        """Запоминает аренды сегментов."""
+        self.leases = leases
+        self.renew_time = ttl / 3
+        self.max_held = max_held or len(leases)
+        self.held = set()
+
+    def shard(self, name):
+        """Возвращает номер сегмента пользователя."""
+        return zlib.crc32(name.encode('utf-8')) % len(self.leases)
+
+    def owns(self, name):
+        """Проверяет, опрашивает ли процесс пользователя."""
+        return self.shard(name) in self.held
+
+    def refresh(self):
+        """Продлевает удерживаемые аренды и захватывает свободные.
+
+        Возвращает номера сегментов, захваченных при этом вызове.
+        """
+        for shard in sorted(self.held):
+            if not self.leases[shard].acquire():
+                self.held.discard(shard)
+                logger.warning(f'Аренда сегмента {shard} потеряна.')
+        gained = set()
+        for shard, lease in enumerate(self.leases):
+            if len(self.held) >= self.max_held:
+                break
+            if shard not in self.held and lease.acquire():
+                self.held.add(shard)
+                gained.add(shard)
+                logger.info(f'Аренда сегмента {shard} захвачена.')
+        return gained
+
+    def release(self):
+        """Освобождает все удерживаемые аренды."""
+        for shard in self.held:
+            self.leases[shard].release()
+        self.held.clear()
+
+
+def make_lease_group(backend, path, ttl, shards=1, max_held=None):
+    """Возвращает группу аренд или None, если аренда не настроена."""
+    if not backend:
+        return None
+    if backend not in LEASE_BACKENDS:
+        raise ValueError(f'Неизвестный способ аренды: {backend}.')
+    lease_class = LEASE_BACKENDS[backend]
+    owner = make_owner()
+    leases = [
+        lease_class(path, f'shard-{shard}', owner, ttl)
+        for shard in range(shards)
+    ]
+    return LeaseGroup(leases, ttl, max_held)
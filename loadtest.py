@@ -0,0 +1,62 @@
+import argparse
+import logging
+import time
+
+import homework
+from cassette import ReplayTransport
+
+
+class NullBot:
+    """Bot, который не отправляет сообщения в Telegram."""
+
+    def __init__(self):
+        """Обнуляет счетчик сообщений."""
+        self.sent = 0
+
+    def send_message(self, chat_id, text):
+        """Считает сообщение отправленным."""
+        self.sent += 1
+
+
+def replay(path, speed=None):
+    """Прогоняет кассету через обработку ответов API и считает время."""
+    transport = ReplayTransport(path, speed)
+    homework.TRANSPORT = transport
+    bot = NullBot()
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(len(transport)):
+        try:
+            response = homework.request_api(0, homework.HEADERS)
+            for homework_item in homework.check_response(response):
+                status = homework.parse_status(homework_item)
+                homework.send_chat_message(bot, 0, status)
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return len(transport), bot.sent, errors, elapsed
+
+
+def main():
+    """Запускает нагрузочный прогон по записанной кассете."""
+    parser = argparse.ArgumentParser(
+        description='Воспроизводит кассету с ответами API без сети.'
+    )
+    parser.add_argument('path', help='путь к файлу кассеты')
+    parser.add_argument(
+        '--speed', type=float, default=None,
+        help='ускорение относительно записанного времени ответа '
+             '(по умолчанию без задержек)',
+    )
+    args = parser.parse_args()
+    homework.logger.setLevel(logging.WARNING)
+    polls, messages, errors, elapsed = replay(args.path, args.speed)
+    print(
+        f'Запросов: {polls}, сообщений: {messages}, ошибок: {errors}, '
+        f'время: {elapsed:.3f} с, '
+        f'{polls / elapsed if elapsed else 0:.1f} запросов/с'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import itertools
+import logging
+from collections import OrderedDict
+from typing import NamedTuple
+
+from exceptions import (
+    BotUnauthorizedError, ChatForbiddenError, SendMessageError,
+)
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('queued', 'sent', 'dropped', 'coalesced', 'retried', 'failed')
+
+
+class Notification(NamedTuple):
+    """Сообщение пользователю tenant, ожидающее отправки в Telegram."""
+
+    tenant: str
+    token: str
+    chat_id: str
+    text: str
+    attempts: int = 0
+
+
+class Lane:
+    """Ограниченная очередь уведомлений одного приоритета.
+
+    Уведомление с тем же ключом, что и ожидающее, заменяет его. При
+    переполнении отбрасывается самое старое уведомление.
+    """
+
+    def __init__(self, name, maxsize):
+        """Создает пустую очередь."""
+        self.name = name
+        self.maxsize = maxsize
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._items = OrderedDict()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        """Возвращает число ожидающих уведомлений."""
+        return len(self._items)
+
+    def full(self):
+        """Проверяет, заполнена ли очередь."""
+        return len(self._items) >= self.maxsize
+
+    def put(self, notification, key=None):
+        """Добавляет уведомление в очередь."""
+        if key is not None and key in self._items:
+            self._items[key] = notification
+            self.counters['coalesced'] += 1
+            return
+        if key is None:
+            key = next(self._counter)
+        if self.full():
+            self._items.popitem(last=False)
+            self.counters['dropped'] += 1
+        self._items[key] = notification
+        self.counters['queued'] += 1
+
+    def pop(self):
+        """Возвращает ключ и самое старое уведомление."""
+        return self._items.popitem(last=False)
+
+    def push_front(self, key, notification):
+        """Возвращает неотправленное уведомление в начало очереди."""
+        self._items[key] = notification
+        self._items.move_to_end(key, last=False)
+
+
+class Notifier:
+    """Отправляет уведомления по приоритетам.
+
+    Уведомления об изменении статуса отправляются первыми и не
+    отбрасываются, пока есть место: при заполнении очереди она сразу
+    отправляется. Статус, который не удалось отправить, повторяется при
+    следующей отправке, но не больше max_attempts раз; остальные чаты
+    его не ждут. Уведомления об ошибках отправляются после статусов, не
+    больше error_budget за раз, по одному ожидающему на чат.
+    """
+
+    def __init__(
+        self, bots, send, telegram_token,
+        status_maxsize=1000, error_maxsize=20, error_budget=10,
+        max_attempts=5,
+    ):
+        """Создает очереди статусов и ошибок."""
+        self.bots = bots
+        self.send = send
+        self.telegram_token = telegram_token
+        self.error_budget = error_budget
+        self.max_attempts = max_attempts
+        self.status_lane = Lane('status', status_maxsize)
+        self.error_lane = Lane('error', error_maxsize)
+        self._reported_dropped = 0
+
+    def _make(self, tenant, text):
+        token = tenant.telegram_token or self.telegram_token
+        return Notification(
+            tenant.name, token, tenant.telegram_chat_id, text,
+        )
+
+    def notify_status(self, tenant, text):
+        """Ставит в очередь уведомление об изменении статуса."""
+        if self.status_lane.full():
+            self._flush_statuses()
+        self.status_lane.put(self._make(tenant, text))
+
+    def notify_error(self, tenant, text):
+        """Ставит в очередь уведомление об ошибке.
+
+        Новое уведомление для чата заменяет еще не отправленное.
+        """
+        notification = self._make(tenant, text)
+        self.error_lane.put(
+            notification, key=(notification.token, notification.chat_id),
+        )
+
+    def _send(self, notification):
+        try:
+            self.send(
+                self.bots.get(notification.token),
+                notification.chat_id,
+                notification.text,
+            )
+        except BotUnauthorizedError:
+            self.bots.evict(notification.token)
+            if notification.token == self.telegram_token:
+                raise
+            logger.critical(
+                f'У Bot чата {notification.chat_id} недостаточно прав для '
+                'выполнения запроса. Возможно неправильно задан '
+                'telegram_token. Уведомление не отправлено.'
+            )
+            return False
+        except ChatForbiddenError as error:
+            logger.error(f'Уведомление не отправлено: {error}')
+            return False
+        return True
+
+    def _flush_statuses(self):
+        lane = self.status_lane
+        retries = []
+        blocked = set()
+        while lane:
+            key, notification = lane.pop()
+            chat = (notification.token, notification.chat_id)
+            if chat in blocked:
+                retries.append((key, notification))
+                continue
+            try:
+                sent = self._send(notification)
+            except SendMessageError as error:
+                blocked.add(chat)
+                notification = notification._replace(
+                    attempts=notification.attempts + 1,
+                )
+                if notification.attempts < self.max_attempts:
+                    retries.append((key, notification))
+                    lane.counters['retried'] += 1
+                    logger.error(
+                        'Bot не смог отправить уведомление в Telegram: '
+                        f'{error}'
+                    )
+                    continue
+                sent = False
+                logger.error(
+                    f'Уведомление для чата {notification.chat_id} '
+                    f'отброшено после {notification.attempts} попыток: '
+                    f'{error}'
+                )
+            lane.counters['sent' if sent else 'failed'] += 1
+        for key, notification in reversed(retries):
+            lane.push_front(key, notification)
+
+    def _flush_errors(self):
+        lane = self.error_lane
+        for _ in range(min(self.error_budget, len(lane))):
+            _, notification = lane.pop()
+            try:
+                sent = self._send(notification)
+            except SendMessageError as error:
+                sent = False
+                logger.error(
+                    'Bot не смог отправить служебное сообщение в Telegram.'
+                    f'{error}'
+                )
+            lane.counters['sent' if sent else 'failed'] += 1
+
+    def flush(self):
+        """Отправляет ожидающие уведомления, начиная со статусов."""
+        self._flush_statuses()
+        self._flush_errors()
+        dropped = sum(
+            lane.counters['dropped']
+            for lane in (self.status_lane, self.error_lane)
+        )
+        if dropped > self._reported_dropped:
+            logger.warning(
+                'Отброшено уведомлений из-за переполнения очереди: '
+                f'{dropped - self._reported_dropped}.'
+            )
+            self._reported_dropped = dropped
+
+    def stats(self):
+        """Возвращает счетчики уведомлений по очередям."""
+        return {
+            lane.name: dict(lane.counters)
+            for lane in (self.status_lane, self.error_lane)
+        }
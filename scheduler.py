@@ -0,0 +1,85 @@
+import heapq
+import itertools
+
+_REMOVED = object()
+
+
+class PollScheduler:
+    """Планировщик опроса API с отдельным сроком для каждого пользователя.
+
+    Сроки хранятся в куче, поэтому на каждом шаге выбираются только те
+    пользователи, которых уже пора опрашивать. Чем выше приоритет, тем
+    раньше пользователь будет опрошен снова: интервал делится на
+    priority + 1.
+    """
+
+    def __init__(self, interval):
+        """Создает пустое расписание."""
+        self.interval = interval
+        self._heap = []
+        self._entries = {}
+        self._last_due = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        """Возвращает число пользователей в расписании."""
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """Проверяет, есть ли пользователь в расписании."""
+        return key in self._entries
+
+    def schedule(self, key, due, priority=0):
+        """Назначает пользователю срок следующего опроса."""
+        self.remove(key)
+        entry = [due, -priority, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, key):
+        """Снимает пользователя с расписания."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[-1] = _REMOVED
+        self._last_due.pop(key, None)
+
+    def spread(self, keys, now):
+        """Равномерно распределяет опросы пользователей по интервалу."""
+        keys = list(keys)
+        if not keys:
+            return
+        step = self.interval / len(keys)
+        for index, key in enumerate(keys):
+            self.schedule(key, now + index * step)
+
+    def pop_due(self, now):
+        """Возвращает пользователей, срок опроса которых наступил."""
+        due_keys = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, _, key = heapq.heappop(self._heap)
+            if key is _REMOVED:
+                continue
+            del self._entries[key]
+            self._last_due[key] = due
+            due_keys.append(key)
+        return due_keys
+
+    def reschedule(self, key, now, priority=0):
+        """Назначает следующий опрос после выполненного.
+
+        Срок отсчитывается от предыдущего, чтобы опросы не смещались
+        и оставались равномерно распределены по интервалу.
+        """
+        delay = self.interval / (priority + 1)
+        due = self._last_due.get(key, now) + delay
+        if due <= now:
+            due = now + delay
+        self.schedule(key, due, priority)
+
+    def next_due(self):
+        """Возвращает ближайший срок опроса или None."""
+        while self._heap and self._heap[0][-1] is _REMOVED:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return self._heap[0][0]
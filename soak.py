@@ -0,0 +1,203 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import homework
+from catchup import Checkpoint
+from clock import VirtualClock
+from config import Settings
+from tenants import Tenant
+
+DAY = 24 * 60 * 60
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+STATUSES = ('reviewing', 'rejected', 'reviewing', 'approved')
+
+
+class StubResponse:
+    """Ответ API, сформированный заглушкой."""
+
+    status_code = 200
+
+    def __init__(self, data):
+        """Кодирует данные ответа в JSON."""
+        self.content = json.dumps(data).encode('utf-8')
+        self.headers = {}
+
+    def json(self):
+        """Декодирует тело ответа из JSON."""
+        return json.loads(self.content)
+
+
+class StubTransport:
+    """Заглушка API: статус работы меняется каждые change_every опросов."""
+
+    def __init__(self, clock, change_every=6):
+        """Запоминает часы и частоту смены статуса."""
+        self.clock = clock
+        self.change_every = change_every
+        self._polls = {}
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """Возвращает ответ API для пользователя из заголовка."""
+        token = headers['Authorization']
+        count = self._polls.get(token, 0)
+        self._polls[token] = count + 1
+        now = int(self.clock.time())
+        homeworks = []
+        if count % self.change_every == 0:
+            change = count // self.change_every
+            homeworks.append({
+                'homework_name': f'hw{change // len(STATUSES)}',
+                'status': STATUSES[change % len(STATUSES)],
+                'date_updated': time.strftime(DATE_FORMAT, time.gmtime(now)),
+            })
+        return StubResponse({'homeworks': homeworks, 'current_date': now})
+
+
+class StubBot:
+    """Bot, который только считает сообщения."""
+
+    def __init__(self):
+        """Обнуляет счетчик сообщений."""
+        self.sent = 0
+
+    def send_message(self, chat_id, text):
+        """Считает сообщение отправленным."""
+        self.sent += 1
+
+
+class StubBotPool:
+    """Пул из одного бота-заглушки."""
+
+    def __init__(self):
+        """Создает бота-заглушку."""
+        self.bot = StubBot()
+
+    def get(self, token):
+        """Возвращает бота-заглушку."""
+        return self.bot
+
+    def evict(self, token):
+        """Ничего не делает."""
+
+    def close(self):
+        """Ничего не делает."""
+
+
+class SoakResult(NamedTuple):
+    """Итоги длительного прогона."""
+
+    cycles: int
+    messages: int
+    rss_growth_kb: int
+    object_growth: int
+
+
+def get_rss_kb():
+    """Возвращает текущий объем резидентной памяти процесса в КБ."""
+    try:
+        with open('/proc/self/statm') as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure():
+    """Возвращает объем памяти и число объектов после сборки мусора."""
+    gc.collect()
+    return get_rss_kb(), len(gc.get_objects())
+
+
+def run_until(worker, clock, end):
+    """Выполняет циклы опроса, пока виртуальное время не дойдет до end."""
+    cycles = 0
+    while clock.time() < end:
+        homework.run_worker(worker, cycles=1)
+        cycles += 1
+    return cycles
+
+
+def soak(days, tenants=10, warmup_days=1):
+    """Прогоняет бота на заглушках с виртуальными часами.
+
+    Замеры памяти делаются после прогрева, чтобы в рост не попали
+    кеши и объекты, создаваемые при первых циклах. Записи лога бота
+    не передаются корневому логгеру: его обработчики, например
+    перехват лога в pytest, могут накапливать записи.
+    """
+    clock = VirtualClock(start=1_600_000_000)
+    saved = homework.CLOCK, homework.TRANSPORT
+    stream = homework.handler.setStream(open(os.devnull, 'w'))
+    propagate = homework.logger.propagate
+    homework.logger.propagate = False
+    homework.CLOCK = clock
+    homework.TRANSPORT = StubTransport(clock)
+    try:
+        settings = Settings(
+            '1234:abcdefg',
+            homework.RETRY_TIME,
+            homework.HOMEWORK_VERDICTS,
+            tuple(
+                Tenant(f'student-{index}', f'token-{index}', str(index))
+                for index in range(tenants)
+            ),
+        )
+        bots = StubBotPool()
+        worker = homework.Worker(settings, Checkpoint(), bots)
+        run_until(worker, clock, clock.time() + warmup_days * DAY)
+        rss_before, objects_before = measure()
+        cycles = run_until(worker, clock, clock.time() + days * DAY)
+        rss_after, objects_after = measure()
+        worker.close()
+    finally:
+        homework.CLOCK, homework.TRANSPORT = saved
+        homework.handler.setStream(stream).close()
+        homework.logger.propagate = propagate
+    return SoakResult(
+        cycles,
+        bots.bot.sent,
+        rss_after - rss_before,
+        objects_after - objects_before,
+    )
+
+
+def main():
+    """Запускает длительный прогон и проверяет рост памяти."""
+    parser = argparse.ArgumentParser(
+        description='Длительный прогон бота с виртуальными часами.'
+    )
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--tenants', type=int, default=10)
+    parser.add_argument(
+        '--max-rss-growth', type=int, default=10 * 1024,
+        help='допустимый рост памяти, КБ',
+    )
+    parser.add_argument(
+        '--max-object-growth', type=int, default=1000,
+        help='допустимый рост числа объектов',
+    )
+    args = parser.parse_args()
+    started = time.perf_counter()
+    result = soak(args.days, args.tenants)
+    print(
+        f'Циклов: {result.cycles}, сообщений: {result.messages}, '
+        f'рост памяти: {result.rss_growth_kb} КБ, '
+        f'рост числа объектов: {result.object_growth}, '
+        f'время: {time.perf_counter() - started:.1f} с'
+    )
+    if (
+        result.rss_growth_kb > args.max_rss_growth
+        or result.object_growth > args.max_object_growth
+    ):
+        print('Рост памяти превышает допустимый.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
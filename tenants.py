@@ -0,0 +1,28 @@
+from typing import NamedTuple
+
+from decoding import ResponseCache
+from error_digest import ErrorDigest
+
+
+class Tenant(NamedTuple):
+    """Пользователь бота: токен Практикум.Домашки и чат для уведомлений.
+
+    Если telegram_token не задан, уведомления отправляет основной бот.
+    """
+
+    name: str
+    practicum_token: str
+    telegram_chat_id: str
+    telegram_token: str = None
+
+
+class TenantState:
+    """Состояние опроса API для одного пользователя."""
+
+    def __init__(self, current_timestamp):
+        """Начинает опрос с метки current_timestamp."""
+        self.current_timestamp = current_timestamp
+        self.previous_homeworks = list()
+        self.errors = ErrorDigest()
+        self.last_status = None
+        self.response_cache = ResponseCache()
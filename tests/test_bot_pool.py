@@ -0,0 +1,32 @@
+import pytest
+
+from bot_pool import BotPool
+from exceptions import BotUnauthorizedError
+
+
+class TestBotPool:
+
+    def test_bot_pool(self):
+        pool = BotPool(con_pool_size=16, connect_timeout=3, read_timeout=7)
+        bot = pool.get('1234:abcdefg')
+        assert pool.get('1234:abcdefg') is bot, (
+            'Проверьте, что для одного токена используется один Bot'
+        )
+        other = pool.get('5678:hijklmn')
+        assert other is not bot and len(pool) == 2
+        assert bot.request is other.request is pool.request, (
+            'Проверьте, что боты используют общий пул соединений'
+        )
+        assert pool.request._connect_timeout == 3
+        pool.evict('1234:abcdefg')
+        assert pool.get('1234:abcdefg') is not bot, (
+            'Проверьте, что Bot с недействительным токеном удаляется из пула'
+        )
+        pool.close()
+        assert len(pool) == 0
+
+    def test_invalid_token(self):
+        pool = BotPool()
+        with pytest.raises(BotUnauthorizedError):
+            pool.get('invalid token')
+        pool.close()
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from cassette import RecordingTransport, ReplayTransport
+from clock import VirtualClock
+from exceptions import CassetteError
+
+
+class MockResponse:
+    headers = {'Content-Type': 'application/json', 'ETag': '"abc"'}
+
+    def __init__(self, data, status_code=200):
+        self.text = json.dumps(data, ensure_ascii=False)
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size=1):
+        content = self.text.encode()
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class MockTransport:
+
+    def __init__(self, random_timestamp):
+        self.random_timestamp = random_timestamp
+
+    def get(self, url, params=None, **kwargs):
+        return MockResponse({
+            'homeworks': [{'homework_name': 'дз "1"', 'status': 'approved'}],
+            'current_date': self.random_timestamp,
+        })
+
+
+class MockErrorTransport:
+
+    def get(self, url, params=None, **kwargs):
+        return MockResponse(
+            {'message': 'Internal Server Error'}, status_code=500,
+        )
+
+
+class TestCassette:
+
+    @pytest.mark.parametrize('name', ['cassette.jsonl', 'cassette.jsonl.gz'])
+    def test_record_replay(self, tmp_path, random_timestamp, api_url, name):
+        path = str(tmp_path / name)
+        recorder = RecordingTransport(MockTransport(random_timestamp), path)
+        headers = {'Authorization': 'OAuth secret'}
+        recorder.get(api_url, headers=headers, params={'from_date': 0})
+        recorder.get(api_url, headers=headers, params={'from_date': 1})
+
+        replay = ReplayTransport(path, speed=None)
+        assert len(replay) == 2, (
+            'Проверьте, что в кассету записывается каждый запрос'
+        )
+        response = replay.get(api_url)
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"abc"'
+        assert response.json()['current_date'] == random_timestamp, (
+            'Проверьте, что из кассеты воспроизводится тело ответа'
+        )
+        assert 'secret' not in str(replay.interactions), (
+            'Проверьте, что токен не сохраняется в кассету'
+        )
+        replay.get(api_url)
+        with pytest.raises(CassetteError):
+            replay.get(api_url)
+
+    def test_record_stream(self, tmp_path, random_timestamp, api_url):
+        path = str(tmp_path / 'cassette.jsonl')
+        recorder = RecordingTransport(MockTransport(random_timestamp), path)
+        response = recorder.get(api_url, params={'from_date': 0}, stream=True)
+        assert not hasattr(response, 'text'), (
+            'Проверьте, что потоковый ответ не читается целиком при записи'
+        )
+        body = b''.join(response.iter_content(3))
+        response.close()
+
+        replay = ReplayTransport(path, speed=None)
+        assert len(replay) == 1
+        replayed = replay.get(api_url)
+        assert replayed.content == body, (
+            'Проверьте, что тело потокового ответа записывается по частям'
+        )
+        assert replayed.json()['homeworks'][0]['homework_name'] == 'дз "1"'
+
+    def test_replay_uses_clock(self, tmp_path, random_timestamp, api_url):
+        path = tmp_path / 'cassette.jsonl'
+        path.write_text(json.dumps({
+            'url': api_url, 'params': None, 'status': 200, 'headers': {},
+            'body': '{}', 'latency': 2.5,
+        }) + '\n')
+        clock = VirtualClock(100)
+        ReplayTransport(str(path), speed=2.0, clock=clock).get(api_url)
+        assert clock.time() == 101.25, (
+            'Проверьте, что задержка ответа выдерживается по часам clock'
+        )
+
+    def test_record_stream_error(self, tmp_path, random_timestamp, api_url):
+        path = str(tmp_path / 'cassette.jsonl')
+        RecordingTransport(MockErrorTransport(), path).get(
+            api_url, stream=True,
+        ).close()
+        RecordingTransport(MockTransport(random_timestamp), path).get(
+            api_url, stream=True,
+        ).close()
+
+        replay = ReplayTransport(path, speed=None)
+        assert len(replay) == 2, (
+            'Проверьте, что потоковый ответ записывается, даже если его '
+            'тело не прочитано'
+        )
+        response = replay.get(api_url)
+        assert response.status_code == 500
+        assert response.json() == {'message': 'Internal Server Error'}
+        assert replay.get(api_url).json()['current_date'] == random_timestamp
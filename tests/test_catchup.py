@@ -0,0 +1,137 @@
+import json
+import os
+
+import pytest
+
+import homework
+from catchup import (
+    Checkpoint, ResponseStream, iter_windows, parse_date, read_window,
+)
+from exceptions import AnotherStatusError
+from tenants import Tenant, TenantState
+
+
+class MockNotifier:
+
+    def __init__(self):
+        self.statuses = []
+
+    def notify_status(self, tenant, text):
+        self.statuses.append(text)
+
+
+def chunked(data, size=1):
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class TestCatchUp:
+
+    def test_response_stream(self, random_timestamp):
+        data = {
+            'current_date': random_timestamp,
+            'homeworks': [
+                {'homework_name': 'Итоговый проект', 'status': 'approved'},
+                {'homework_name': 'hw123', 'status': 'rejected'},
+            ],
+        }
+        stream = ResponseStream(chunked(data))
+        assert list(stream) == data['homeworks'], (
+            'Проверьте, что работы читаются из потока по одной'
+        )
+        assert stream.fields == {'current_date': random_timestamp}
+        assert stream.keys == {'homeworks', 'current_date'}
+
+    def test_response_stream_not_list(self):
+        stream = ResponseStream(chunked({'homeworks': {}}))
+        with pytest.raises(TypeError):
+            list(stream)
+
+    def test_iter_windows(self):
+        assert list(iter_windows(0, 250, 100)) == [
+            (0, 100, False), (100, 200, False), (200, 250, True),
+        ]
+        assert list(iter_windows(0, 50, 100)) == [(0, 50, True)]
+
+    def test_read_window(self, random_timestamp):
+        late = {'homework_name': 'late', 'status': 'approved',
+                'date_updated': '2020-02-14T00:00:00Z'}
+        early = {'homework_name': 'early', 'status': 'reviewing',
+                 'date_updated': '2020-02-13T14:40:57Z'}
+        data = {'homeworks': [late, early], 'current_date': random_timestamp}
+        window_start = parse_date('2020-02-13T00:00:00Z')
+        window_end = parse_date('2020-02-13T23:00:00Z')
+        homeworks, current_date = read_window(
+            chunked(data, 7), window_start, window_end, final=False,
+        )
+        assert homeworks == [early], (
+            'Проверьте, что в окно попадают только работы, '
+            'обновленные до конца окна'
+        )
+        assert current_date == random_timestamp
+        homeworks, _ = read_window(
+            chunked(data, 7), window_start, window_end, final=True,
+        )
+        assert homeworks == [early, late], (
+            'Проверьте, что работы в окне упорядочены по дате обновления'
+        )
+
+    def test_read_window_no_current_date(self):
+        with pytest.raises(KeyError):
+            read_window(chunked({'homeworks': []}), 0, 0, final=True)
+
+    def test_checkpoint(self, tmp_path):
+        path = str(tmp_path / 'checkpoint.json')
+        checkpoint = Checkpoint(path)
+        assert checkpoint.get('default', 10) == 10
+        checkpoint.save('default', 20)
+        assert Checkpoint(path).get('default', 10) == 10, (
+            'Проверьте, что прогресс записывается в файл только при commit'
+        )
+        checkpoint.commit()
+        assert Checkpoint(path).get('default', 10) == 20, (
+            'Проверьте, что прогресс сохраняется в файл'
+        )
+
+    def test_checkpoint_shared(self, tmp_path):
+        path = str(tmp_path / 'checkpoint.json')
+        first, second = Checkpoint(path), Checkpoint(path)
+        first.save('student-1', 10)
+        first.commit()
+        second.save('student-2', 20)
+        second.save('student-3', 5)
+        second.commit()
+        first.save('student-1', 30)
+        first.save('student-3', 2)
+        first.commit()
+        checkpoint = Checkpoint(path)
+        assert checkpoint.get('student-1', 0) == 30
+        assert checkpoint.get('student-2', 0) == 20, (
+            'Проверьте, что процесс не затирает метки чужих пользователей'
+        )
+        assert checkpoint.get('student-3', 0) == 5, (
+            'Проверьте, что метка в файле не уменьшается'
+        )
+        assert sorted(os.listdir(tmp_path)) == [
+            'checkpoint.json', 'checkpoint.json.lock',
+        ], 'Проверьте, что временные файлы не остаются после записи'
+
+    def test_catch_up_invalid_window(self, monkeypatch, random_timestamp):
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'weird'},
+        ]
+        monkeypatch.setattr(
+            homework, 'request_window',
+            lambda *args: (homeworks, random_timestamp),
+        )
+        notifier = MockNotifier()
+        state = TenantState(0)
+        tenant = Tenant('student', 'token', '1')
+        with pytest.raises(AnotherStatusError):
+            homework.catch_up(notifier, tenant, state, Checkpoint())
+        assert notifier.statuses == [], (
+            'Проверьте, что уведомления окна не отправляются, если одна '
+            'из работ не прошла проверку'
+        )
+        assert state.current_timestamp == 0
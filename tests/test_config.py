@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from config import ConfigWatcher, Settings, load_settings
+from exceptions import ConfigError
+from tenants import Tenant
+
+DEFAULTS = Settings(
+    '1234:abcdefg', 600, {'approved': 'Ура!'},
+    (Tenant('default', 'sometoken', '12345'),),
+)
+
+
+def write_config(path, data, mtime):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+class TestConfig:
+
+    def test_load_settings(self, tmp_path):
+        path = tmp_path / 'config.json'
+        write_config(path, {
+            'retry_time': 300,
+            'tenants': [
+                {'name': 'a', 'practicum_token': 't',
+                 'telegram_chat_id': '1'},
+            ],
+        }, 1)
+        settings = load_settings(str(path), DEFAULTS)
+        assert settings.retry_time == 300
+        assert settings.tenants == (Tenant('a', 't', '1'),), (
+            'Проверьте, что пользователи читаются из файла конфигурации'
+        )
+        assert settings.homework_verdicts == DEFAULTS.homework_verdicts, (
+            'Проверьте, что незаданные настройки берутся по умолчанию'
+        )
+
+    @pytest.mark.parametrize('data', [
+        {'retry_time': 0},
+        {'homework_verdicts': []},
+        {'tenants': [{'name': 'a'}]},
+        {'tenants': []},
+    ])
+    def test_load_invalid_settings(self, tmp_path, data):
+        path = tmp_path / 'config.json'
+        write_config(path, data, 1)
+        with pytest.raises(ConfigError):
+            load_settings(str(path), DEFAULTS)
+
+    def test_watcher(self, tmp_path):
+        path = tmp_path / 'config.json'
+        write_config(path, {'retry_time': 300}, 1)
+        watcher = ConfigWatcher(str(path), DEFAULTS)
+        assert watcher.settings.retry_time == 300
+        assert watcher.poll() is None, (
+            'Проверьте, что неизмененный файл не перечитывается'
+        )
+        write_config(path, {'retry_time': -1}, 2)
+        assert watcher.poll() is None, (
+            'Проверьте, что некорректные настройки не применяются'
+        )
+        assert watcher.settings.retry_time == 300
+        write_config(path, {'retry_time': 120}, 3)
+        settings = watcher.poll()
+        assert settings is not None and settings.retry_time == 120, (
+            'Проверьте, что измененный файл перечитывается'
+        )
+
+    def test_watcher_missing_file(self, tmp_path):
+        with pytest.raises(ConfigError):
+            ConfigWatcher(str(tmp_path / 'missing.json'), DEFAULTS)
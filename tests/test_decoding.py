@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from decoding import ResponseCache, get_json_loads
+
+
+class TestDecoding:
+
+    def test_json_backend(self):
+        loads = get_json_loads('json')
+        assert loads(b'{"homeworks": []}') == {'homeworks': []}
+        assert get_json_loads()(b'[1]') == [1], (
+            'Проверьте, что декодер по умолчанию доступен всегда'
+        )
+        with pytest.raises(ValueError):
+            get_json_loads('unknown')
+
+    def test_response_cache(self, random_timestamp):
+        body = json.dumps({
+            'homeworks': [], 'current_date': random_timestamp,
+        }).encode('utf-8')
+        cache = ResponseCache()
+        assert not cache.check(body, '"abc"')
+        assert not cache.check(body), (
+            'Проверьте, что необработанный ответ не считается известным'
+        )
+        cache.commit()
+        assert cache.check(body), (
+            'Проверьте, что повторный ответ распознается как неизменный'
+        )
+        assert cache.etag is None
+        assert not cache.check(body + b' ')
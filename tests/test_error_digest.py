@@ -0,0 +1,37 @@
+from error_digest import ErrorDigest, fingerprint
+from exceptions import EndpointAPIError, RequestAPIError
+
+
+class TestErrorDigest:
+
+    def test_fingerprint(self):
+        first = RequestAPIError('Код ответа API: 500, from_date=1000198000')
+        second = RequestAPIError('Код ответа API: 502, from_date=1000198991')
+        assert fingerprint(first) == fingerprint(second), (
+            'Проверьте, что изменяемые данные не влияют на отпечаток ошибки'
+        )
+        assert fingerprint(first) != fingerprint(
+            EndpointAPIError('Код ответа API: 500, from_date=1000198000')
+        ), 'Проверьте, что класс ошибки входит в отпечаток'
+
+    def test_digest(self):
+        digest = ErrorDigest(interval=3600, window=3600)
+        message = digest.record(RequestAPIError('Код ответа API: 500'), 0)
+        assert message == 'Сбой в работе программы: Код ответа API: 500', (
+            'Проверьте, что о первой ошибке сообщается сразу'
+        )
+        for now in range(1, 37):
+            assert digest.record(
+                RequestAPIError(f'Код ответа API: {500 + now % 3}'), now,
+            ) is None, 'Проверьте, что повторные ошибки не отправляются'
+        message = digest.record(RequestAPIError('Код ответа API: 504'), 3600)
+        assert 'RequestAPIError ×37' in message, (
+            'Проверьте, что сводка содержит число ошибок за окно'
+        )
+        assert digest.recover(3600) == (
+            'Работа программы восстановлена. '
+            'Сбоев за последние 60 мин.: 37.'
+        )
+        assert digest.recover(3601) is None, (
+            'Проверьте, что о восстановлении сообщается один раз'
+        )
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+import homework
+from history import HistoryStore
+from tenants import Tenant, TenantState
+
+HOUR = 60 * 60
+
+
+class LockedHistory:
+
+    def record(self, tenant, homework, status, updated_at):
+        raise sqlite3.OperationalError('database is locked')
+
+
+class MockNotifier:
+
+    def __init__(self):
+        self.statuses = []
+
+    def notify_status(self, tenant, text):
+        self.statuses.append(text)
+
+
+class TestHistory:
+
+    def test_history(self, tmp_path):
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+        assert store.record('student', 'hw1', 'reviewing', 0)
+        assert not store.record('student', 'hw1', 'reviewing', HOUR), (
+            'Проверьте, что повторный статус не сохраняется как переход'
+        )
+        store.record('student', 'hw1', 'rejected', 2 * HOUR)
+        store.record('student', 'hw1', 'reviewing', 5 * HOUR)
+        store.record('student', 'hw1', 'approved', 9 * HOUR)
+        store.record('student', 'hw2', 'reviewing', 0)
+
+        stats = store.homework_stats('student', 'hw1')
+        assert stats['last_status'] == 'approved'
+        assert stats['reviews'] == 2
+        assert stats['rejections'] == 1
+        assert stats['to_reviewing_avg'] == 3 * HOUR, (
+            'Проверьте, что время до проверки отсчитывается от вердикта'
+        )
+        assert stats['to_verdict_avg'] == 3 * HOUR, (
+            'Проверьте, что время проверки отсчитывается от ее начала'
+        )
+
+        stats = store.tenant_stats('student')
+        assert stats['homeworks'] == 2
+        assert stats['reviews'] == 3
+        assert stats['to_verdict_avg'] == 3 * HOUR
+        assert store.tenant_stats('unknown') is None
+        rows = store.connection.execute(
+            'SELECT COUNT(*) FROM transitions'
+        ).fetchone()
+        assert rows[0] == 5
+        store.close()
+
+    def test_history_before_notify(
+        self, tmp_path, monkeypatch, random_timestamp,
+    ):
+        response = {
+            'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+            'current_date': random_timestamp,
+        }
+        monkeypatch.setattr(homework, 'request_api', lambda *args: response)
+        notifier = MockNotifier()
+        tenant = Tenant('student', 'token', '1')
+        state = TenantState(0)
+        with pytest.raises(sqlite3.OperationalError):
+            homework.check_updates(notifier, tenant, state, LockedHistory())
+        assert notifier.statuses == [], (
+            'Проверьте, что статус не ставится в очередь, пока он не '
+            'сохранен в историю'
+        )
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+        homework.check_updates(notifier, tenant, state, store)
+        homework.check_updates(notifier, tenant, state, store)
+        assert len(notifier.statuses) == 1
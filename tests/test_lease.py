@@ -0,0 +1,124 @@
+import json
+
+import homework
+import lease
+from catchup import Checkpoint
+from clock import VirtualClock
+from config import Settings
+from lease import FileLease, LeaseGroup, SQLiteLease
+from soak import StubBotPool, StubTransport
+from tenants import Tenant
+
+
+class LosingLeaseGroup:
+    """Группа аренд, теряющая сегмент после lose_after продлений."""
+
+    renew_time = 0
+
+    def __init__(self, lose_after):
+        self.held = {0}
+        self.lose_after = lose_after
+        self.refreshes = 0
+
+    def shard(self, name):
+        return 0
+
+    def owns(self, name):
+        return self.shard(name) in self.held
+
+    def refresh(self):
+        self.refreshes += 1
+        if self.refreshes > self.lose_after:
+            self.held.clear()
+        return set()
+
+    def release(self):
+        self.held.clear()
+
+
+class TestLease:
+
+    def test_file_lease(self, tmp_path):
+        path = str(tmp_path / 'bot')
+        leader = FileLease(path, 'shard-0', 'leader', 15)
+        standby = FileLease(path, 'shard-0', 'standby', 15)
+        assert leader.acquire()
+        assert leader.acquire(), 'Проверьте, что владелец продлевает аренду'
+        assert not standby.acquire(), (
+            'Проверьте, что занятую аренду нельзя захватить'
+        )
+        leader.release()
+        assert standby.acquire(), (
+            'Проверьте, что освобожденную аренду можно захватить'
+        )
+
+    def test_sqlite_lease_expires(self, tmp_path, monkeypatch):
+        path = str(tmp_path / 'lease.sqlite3')
+        now = [1000.0]
+        monkeypatch.setattr(lease.time, 'time', lambda: now[0])
+        leader = SQLiteLease(path, 'shard-0', 'leader', 15)
+        standby = SQLiteLease(path, 'shard-0', 'standby', 15)
+        assert leader.acquire()
+        assert not standby.acquire()
+        now[0] += 10
+        assert leader.acquire()
+        now[0] += 10
+        assert not standby.acquire(), (
+            'Проверьте, что продленную аренду нельзя захватить'
+        )
+        now[0] += 20
+        assert standby.acquire(), (
+            'Проверьте, что просроченную аренду захватывает другой процесс'
+        )
+        assert not leader.acquire()
+
+    def test_lease_group_shards(self, tmp_path):
+        path = str(tmp_path / 'bot')
+
+        def make_group(owner):
+            leases = [
+                FileLease(path, f'shard-{shard}', owner, 15)
+                for shard in range(2)
+            ]
+            return LeaseGroup(leases, 15, max_held=1)
+
+        first, second = make_group('first'), make_group('second')
+        assert first.refresh() == {0}
+        assert second.refresh() == {1}, (
+            'Проверьте, что процессы делят сегменты между собой'
+        )
+        names = ['student-1', 'student-2', 'student-3', 'student-4']
+        for name in names:
+            assert first.owns(name) != second.owns(name), (
+                'Проверьте, что каждого пользователя опрашивает один процесс'
+            )
+        first.release()
+        second.max_held = 2
+        assert second.refresh() == {0}, (
+            'Проверьте, что освобожденный сегмент забирает другой процесс'
+        )
+
+    def test_worker_lost_shard(self, tmp_path, monkeypatch):
+        clock = VirtualClock(start=1_600_000_000)
+        monkeypatch.setattr(homework, 'CLOCK', clock)
+        monkeypatch.setattr(homework, 'TRANSPORT', StubTransport(clock))
+        path = tmp_path / 'checkpoint.json'
+        now = int(clock.time())
+        path.write_text(json.dumps({'student': now - 600}))
+        settings = Settings(
+            '1234:abcdefg', 600, homework.HOMEWORK_VERDICTS,
+            (Tenant('student', 'token', '1'),),
+        )
+        bots = StubBotPool()
+        worker = homework.Worker(
+            settings, Checkpoint(str(path)), bots, LosingLeaseGroup(2),
+        )
+        worker.run_cycle(clock.time())
+        assert worker.leases.refreshes == 3 and not worker.leases.held
+        worker.close()
+        assert Checkpoint(str(path)).get('student', 0) == now
+        assert bots.bot.sent == 1, (
+            'Проверьте, что уведомления потерянного сегмента отправляются, '
+            'если прогресс опроса уже продвинут'
+        )
+        assert worker.notifier.stats()['status']['dropped'] == 0
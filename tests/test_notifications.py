@@ -0,0 +1,138 @@
+import pytest
+
+from exceptions import (
+    BotUnauthorizedError, ChatForbiddenError, SendMessageError,
+)
+from notifications import Notifier
+from tenants import Tenant
+
+TENANTS = [
+    Tenant(f'student-{index}', 'sometoken', index) for index in range(5)
+]
+
+
+class MockBotPool:
+
+    def __init__(self):
+        self.evicted = []
+
+    def get(self, token):
+        return token
+
+    def evict(self, token):
+        self.evicted.append(token)
+
+
+class MockSend:
+
+    def __init__(self, errors=(), poisoned=()):
+        self.sent = []
+        self.errors = list(errors)
+        self.poisoned = poisoned
+
+    def __call__(self, bot, chat_id, text):
+        if chat_id in self.poisoned:
+            raise SendMessageError('Timed out')
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(text)
+
+
+class TestNotifier:
+
+    def make_notifier(self, send, **kwargs):
+        return Notifier(MockBotPool(), send, '1234:abcdefg', **kwargs)
+
+    def test_status_first(self):
+        send = MockSend()
+        notifier = self.make_notifier(send)
+        notifier.notify_error(TENANTS[0], 'Сбой')
+        notifier.notify_status(TENANTS[0], 'Статус 1')
+        notifier.notify_status(TENANTS[1], 'Статус 2')
+        notifier.flush()
+        assert send.sent == ['Статус 1', 'Статус 2', 'Сбой'], (
+            'Проверьте, что статусы отправляются раньше сообщений об ошибках'
+        )
+
+    def test_error_shedding(self):
+        send = MockSend()
+        notifier = self.make_notifier(send, error_maxsize=3, error_budget=2)
+        notifier.notify_error(TENANTS[0], 'Сбой 1')
+        notifier.notify_error(TENANTS[0], 'Сбой 2')
+        for tenant in TENANTS[1:]:
+            notifier.notify_error(tenant, 'Сбой')
+        notifier.flush()
+        stats = notifier.stats()['error']
+        assert stats['coalesced'] == 1, (
+            'Проверьте, что ожидающее сообщение об ошибке для чата заменяется'
+        )
+        assert stats['dropped'] == 2, (
+            'Проверьте, что при переполнении отбрасываются старые сообщения'
+        )
+        assert stats['sent'] == 2 and len(send.sent) == 2, (
+            'Проверьте, что сообщения об ошибках отправляются в пределах лимита'
+        )
+
+    def test_status_retry(self):
+        send = MockSend(errors=[SendMessageError('Timed out')])
+        notifier = self.make_notifier(send)
+        notifier.notify_status(TENANTS[0], 'Статус')
+        notifier.notify_error(TENANTS[0], 'Сбой')
+        notifier.flush()
+        assert send.sent == ['Сбой'], (
+            'Проверьте, что сбой отправки статуса не задерживает ошибки'
+        )
+        notifier.flush()
+        assert send.sent == ['Сбой', 'Статус'], (
+            'Проверьте, что неотправленный статус не теряется'
+        )
+
+    def test_unauthorized(self):
+        send = MockSend(
+            errors=[BotUnauthorizedError(), BotUnauthorizedError()],
+        )
+        notifier = self.make_notifier(send)
+        tenant = TENANTS[0]._replace(telegram_token='5678:hijklmn')
+        notifier.notify_status(tenant, 'Статус')
+        notifier.flush()
+        assert notifier.bots.evicted == ['5678:hijklmn']
+        notifier.notify_status(TENANTS[0], 'Статус')
+        with pytest.raises(BotUnauthorizedError):
+            notifier.flush()
+
+    def test_forbidden(self):
+        send = MockSend(errors=[ChatForbiddenError('bot was blocked')])
+        notifier = self.make_notifier(send)
+        notifier.notify_status(TENANTS[0], 'Статус 1')
+        notifier.notify_status(TENANTS[1], 'Статус 2')
+        notifier.flush()
+        assert notifier.bots.evicted == [], (
+            'Проверьте, что токен не удаляется, если бот заблокирован в чате'
+        )
+        assert send.sent == ['Статус 2']
+        assert notifier.stats()['status']['failed'] == 1
+
+    def test_poisoned_chat(self):
+        poisoned, healthy = TENANTS[0], TENANTS[1]
+        send = MockSend(poisoned={poisoned.telegram_chat_id})
+        notifier = self.make_notifier(send, max_attempts=3)
+        notifier.notify_status(poisoned, 'Статус 1')
+        notifier.notify_status(poisoned, 'Статус 2')
+        notifier.notify_status(healthy, 'Статус 3')
+        notifier.notify_error(healthy, 'Сбой')
+        notifier.flush()
+        assert send.sent == ['Статус 3', 'Сбой'], (
+            'Проверьте, что сбой отправки в один чат не блокирует остальные'
+        )
+        notifier.notify_status(healthy, 'Статус 4')
+        notifier.flush()
+        notifier.flush()
+        assert send.sent == ['Статус 3', 'Сбой', 'Статус 4']
+        stats = notifier.stats()['status']
+        assert stats['failed'] == 1 and stats['retried'] == 2, (
+            'Проверьте, что уведомление отбрасывается после max_attempts '
+            'попыток'
+        )
+        assert len(notifier.status_lane) == 1, (
+            'Проверьте, что следующие уведомления чата ждут своей очереди'
+        )
@@ -0,0 +1,44 @@
+from scheduler import PollScheduler
+
+
+class TestPollScheduler:
+
+    def test_spread(self):
+        scheduler = PollScheduler(600)
+        scheduler.spread(['a', 'b', 'c'], 1000)
+        assert scheduler.pop_due(1000) == ['a'], (
+            'Проверьте, что первый пользователь опрашивается сразу'
+        )
+        assert scheduler.pop_due(1199) == [], (
+            'Проверьте, что опросы распределяются по интервалу равномерно'
+        )
+        assert scheduler.pop_due(1400) == ['b', 'c']
+        assert len(scheduler) == 0
+
+    def test_reschedule_keeps_phase(self):
+        scheduler = PollScheduler(600)
+        scheduler.schedule('a', 1000)
+        scheduler.pop_due(1005)
+        scheduler.reschedule('a', 1005)
+        assert scheduler.next_due() == 1600, (
+            'Проверьте, что следующий срок отсчитывается от предыдущего'
+        )
+
+    def test_reschedule_priority(self):
+        scheduler = PollScheduler(600)
+        scheduler.spread(['a', 'b'], 1000)
+        scheduler.pop_due(1300)
+        scheduler.reschedule('a', 1300, priority=1)
+        scheduler.reschedule('b', 1300)
+        assert scheduler.pop_due(1600) == ['a'], (
+            'Проверьте, что пользователь с приоритетом опрашивается раньше'
+        )
+
+    def test_remove(self):
+        scheduler = PollScheduler(600)
+        scheduler.spread(['a', 'b'], 1000)
+        scheduler.remove('a')
+        assert 'a' not in scheduler
+        assert scheduler.next_due() == 1300
+        assert scheduler.pop_due(2000) == ['b']
+        assert scheduler.next_due() is None
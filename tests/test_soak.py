@@ -0,0 +1,30 @@
+import homework
+from clock import SystemClock, VirtualClock
+from soak import soak
+
+
+class TestSoak:
+
+    def test_virtual_clock(self):
+        clock = VirtualClock(start=100)
+        clock.sleep(600)
+        clock.sleep(-1)
+        assert clock.time() == 700, (
+            'Проверьте, что виртуальные часы двигаются только при sleep'
+        )
+
+    def test_soak(self):
+        result = soak(days=2, tenants=3)
+        assert result.cycles >= 2 * 144 * 3, (
+            'Проверьте, что пользователи опрашиваются не реже RETRY_TIME'
+        )
+        assert result.messages > 0
+        assert result.object_growth < 1000, (
+            'Проверьте, что число объектов не растет от цикла к циклу'
+        )
+        assert result.rss_growth_kb < 1024, (
+            'Проверьте, что память процесса не растет от цикла к циклу'
+        )
+        assert isinstance(homework.CLOCK, SystemClock), (
+            'Проверьте, что после прогона восстанавливаются системные часы'
+        )
@@ -0,0 +1,60 @@
+import json
+import logging
+
+import pytest
+
+from tracing import (
+    STATUS_ERROR, JSONLinesExporter, TraceFilter, Tracer, current_span,
+)
+
+
+class TestTracing:
+
+    def test_spans(self, tmp_path):
+        path = tmp_path / 'spans.jsonl'
+        tracer = Tracer(JSONLinesExporter(str(path)))
+        with tracer.span('cycle') as cycle:
+            with tracer.span('http.request', from_date=0) as request:
+                assert current_span() is request
+            with pytest.raises(KeyError):
+                with tracer.span('validate'):
+                    raise KeyError('homeworks')
+        assert current_span() is None
+        with tracer.span('cycle') as other:
+            pass
+        tracer.close()
+
+        assert request.trace_id == cycle.trace_id, (
+            'Проверьте, что вложенные интервалы относятся к одной трассировке'
+        )
+        assert request.parent_id == cycle.span_id
+        assert other.trace_id != cycle.trace_id, (
+            'Проверьте, что каждый цикл начинает новую трассировку'
+        )
+        spans = [
+            json.loads(line)
+            for line in path.read_text(encoding='utf-8').splitlines()
+        ]
+        assert [span['name'] for span in spans] == [
+            'http.request', 'validate', 'cycle', 'cycle',
+        ]
+        assert spans[0]['parentSpanId'] == cycle.span_id
+        assert spans[0]['attributes'] == [
+            {'key': 'from_date', 'value': {'intValue': '0'}},
+        ]
+        assert spans[1]['status'] == {'code': STATUS_ERROR}
+        assert int(spans[2]['endTimeUnixNano']) >= int(
+            spans[2]['startTimeUnixNano']
+        )
+
+    def test_trace_filter(self):
+        record = logging.LogRecord(
+            'homework', logging.INFO, '', 0, '', (), None,
+        )
+        TraceFilter().filter(record)
+        assert record.trace_id == '-'
+        with Tracer().span('cycle') as span:
+            TraceFilter().filter(record)
+        assert (record.trace_id, record.span_id) == (
+            span.trace_id, span.span_id,
+        ), 'Проверьте, что в запись лога добавляются идентификаторы'
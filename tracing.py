@@ -0,0 +1,127 @@
+import contextvars
+import json
+import logging
+import secrets
+import time
+from contextlib import contextmanager
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """Интервал работы программы внутри трассировки цикла опроса."""
+
+    def __init__(self, name, parent=None, attributes=None):
+        """Открывает интервал, наследуя трассировку родителя."""
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.start_time = time.time_ns()
+        self.end_time = None
+
+    def set_attribute(self, key, value):
+        """Добавляет атрибут интервала."""
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        """Возвращает интервал в формате OTLP JSON."""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time),
+            'attributes': [
+                {'key': key, 'value': otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            'status': {'code': self.status},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def otlp_value(value):
+    """Переводит значение атрибута в формат OTLP."""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def current_span():
+    """Возвращает текущий интервал или None."""
+    return _current_span.get()
+
+
+class JSONLinesExporter:
+    """Записывает завершенные интервалы в файл, по строке JSON на интервал."""
+
+    def __init__(self, path):
+        """Открывает файл для дозаписи."""
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def export(self, span):
+        """Записывает интервал."""
+        self.file.write(json.dumps(span.to_otlp()) + '\n')
+        self.file.flush()
+
+    def close(self):
+        """Закрывает файл."""
+        self.file.close()
+
+
+class Tracer:
+    """Создает вложенные интервалы и передает завершенные экспортеру.
+
+    Интервал без родителя начинает новую трассировку. Без экспортера
+    интервалы только связывают записи в логе.
+    """
+
+    def __init__(self, exporter=None):
+        """Запоминает экспортер интервалов."""
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Открывает интервал на время выполнения блока."""
+        span = Span(name, current_span(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.status = STATUS_ERROR
+            span.set_attribute('exception.type', type(error).__name__)
+            raise
+        finally:
+            span.end_time = time.time_ns()
+            _current_span.reset(token)
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+    def close(self):
+        """Закрывает экспортер."""
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+class TraceFilter(logging.Filter):
+    """Добавляет в записи лога идентификаторы трассировки и интервала."""
+
+    def filter(self, record):
+        """Дополняет запись и пропускает ее дальше."""
+        span = current_span()
+        record.trace_id = span.trace_id if span else '-'
+        record.span_id = span.span_id if span else '-'
+        return True